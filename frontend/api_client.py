@@ -9,6 +9,32 @@ import streamlit as st
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
 
+# orjson parses the (large) insights payload several times faster; stdlib json as fallback
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_insights(base_url: str, timeout: float, ficha_id: str, token: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Fetch insights from the API, cached across reruns.
+    
+    The access token is part of the cache key, so cached data is never
+    shared between users. Errors are raised (and therefore not cached),
+    except 404 which means no analysis exists yet.
+    """
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    with httpx.Client(base_url=base_url, timeout=timeout) as client:
+        response = client.get(f"/insights/{ficha_id}", headers=headers)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return _loads(response.content)
+
 
 class APIClient:
     """Client for communicating with Pixely Partners API."""
@@ -61,18 +87,20 @@ class APIClient:
             return None
     
     def get_insights(self, ficha_id: str) -> Optional[Dict[str, Any]]:
-        """Get all insights for a client."""
+        """
+        Get all insights for a client.
+        
+        Responses are cached for a short TTL per (ficha, token), so reruns and
+        repeated view loads don't hit the API again.
+        """
         try:
-            with httpx.Client(base_url=self.base_url, timeout=self.timeout) as client:
-                response = client.get(
-                    f"/insights/{ficha_id}",
-                    headers=self._get_headers()
-                )
-                response.raise_for_status()
-                return response.json()
+            return _fetch_insights(
+                self.base_url,
+                self.timeout,
+                ficha_id,
+                st.session_state.get("access_token")
+            )
         except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                return None
             st.error(f"Error al obtener insights: {e}")
             return None
         except Exception as e:
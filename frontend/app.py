@@ -9,6 +9,7 @@ import streamlit as st # type: ignore
 import streamlit.components.v1 as components # type: ignore
 import os
 import base64
+import html
 import plotly.graph_objects as go  # type: ignore
 from pathlib import Path
 from api_client import APIClient, init_session_state, is_authenticated
@@ -890,21 +891,22 @@ elif page == "Hilos de Trabajo":
                         st.rerun()
             
             with col_act2:
-                # Input para notas
-                note_content = st.text_input(
-                    "Notas:", 
-                    placeholder="¿Qué tal fue? Añade tus notas...", 
-                    key=f"notes_input_{task_id}",
-                    label_visibility="collapsed"
-                )
-                
-                # Si hay contenido, mostrar botón para guardar
-                if note_content:
-                    if st.button("💾 Guardar Nota", key=f"save_note_{task_id}"):
-                        result = client.add_task_note(task_id, note_content)
-                        if result:
-                            st.success("✅ Nota guardada")
-                            st.rerun()
+                # Input para notas dentro de un form: escribir no dispara reruns,
+                # solo el envío (botón o Enter) provoca un único rerun
+                with st.form(key=f"note_form_{task_id}", clear_on_submit=True, border=False):
+                    note_content = st.text_input(
+                        "Notas:",
+                        placeholder="¿Qué tal fue? Añade tus notas...",
+                        key=f"notes_input_{task_id}",
+                        label_visibility="collapsed"
+                    )
+                    note_submitted = st.form_submit_button("💾 Guardar Nota")
+
+                if note_submitted and note_content:
+                    result = client.add_task_note(task_id, note_content)
+                    if result:
+                        st.success("✅ Nota guardada")
+                        st.rerun()
             
             with col_act3:
                 # EL GANCHO: Botón de WhatsApp
@@ -921,34 +923,42 @@ elif page == "Hilos de Trabajo":
             notes = client.get_task_notes(task_id)
             if notes and len(notes) > 0:
                 with st.expander(f"📝 Ver notas ({len(notes)})"):
-                    for note in notes:
-                        note_id = note.get('id')
-                        created_at = note.get('created_at', '')[:19]
-                        content = note.get('content', '')
+                    # Todas las notas en un solo bloque HTML (un solo mensaje por tarea)
+                    notes_html = "".join(
+                        f"<div class=\"note-item\"><small>📅 {note.get('created_at', '')[:19]}</small><br>"
+                        f"{html.escape(note.get('content', ''))}</div>"
+                        for note in notes
+                    )
+                    st.markdown(notes_html, unsafe_allow_html=True)
 
-                        st.markdown("<div class=\"note-item\">", unsafe_allow_html=True)
-                        st.write(f"📅 {created_at}")
-                        edit_content = st.text_area(
-                            "Editar nota:",
-                            value=content,
-                            key=f"note_edit_content_{note_id}",
-                            label_visibility="collapsed",
-                            height=100
-                        )
-                        cols_note = st.columns([1, 1])
-                        with cols_note[0]:
-                            if st.button("💾 Guardar cambios", key=f"save_edit_note_{note_id}"):
-                                result = client.update_task_note(task_id, note_id, edit_content)
-                                if result:
-                                    st.success("✅ Nota actualizada")
-                                    st.rerun()
-                        with cols_note[1]:
-                            if st.button("🗑️ Eliminar", key=f"delete_note_{note_id}"):
-                                ok = client.delete_task_note(task_id, note_id)
-                                if ok:
-                                    st.success("✅ Nota eliminada")
-                                    st.rerun()
-                        st.markdown("</div>", unsafe_allow_html=True)
+                    # Edición: un único editor para la nota seleccionada
+                    notes_by_id = {note.get('id'): note for note in notes}
+                    note_id = st.selectbox(
+                        "Editar nota:",
+                        list(notes_by_id.keys()),
+                        format_func=lambda nid: f"📅 {notes_by_id[nid].get('created_at', '')[:19]}",
+                        key=f"note_edit_select_{task_id}"
+                    )
+                    edit_content = st.text_area(
+                        "Editar nota:",
+                        value=notes_by_id[note_id].get('content', ''),
+                        key=f"note_edit_content_{note_id}",
+                        label_visibility="collapsed",
+                        height=100
+                    )
+                    cols_note = st.columns([1, 1])
+                    with cols_note[0]:
+                        if st.button("💾 Guardar cambios", key=f"save_edit_note_{note_id}"):
+                            result = client.update_task_note(task_id, note_id, edit_content)
+                            if result:
+                                st.success("✅ Nota actualizada")
+                                st.rerun()
+                    with cols_note[1]:
+                        if st.button("🗑️ Eliminar", key=f"delete_note_{note_id}"):
+                            ok = client.delete_task_note(task_id, note_id)
+                            if ok:
+                                st.success("✅ Nota eliminada")
+                                st.rerun()
             
             st.markdown("</div>", unsafe_allow_html=True)
 
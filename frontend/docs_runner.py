@@ -1,25 +1,59 @@
 """Docs runner: import legacy `docs/*.py` view modules and expose their display functions in Streamlit.
 
-This module discovers Python files under the repo `docs/` folder, imports them as `docs.<mod>` and
-looks for callables whose name starts with `display_`. It then shows a selector and calls the chosen
-display function inside the Streamlit app.
+This module discovers Python files under the repo `docs/` folder, parses them for top-level functions
+whose name starts with `display_`, and shows a selector. Only the chosen module is imported (as
+`docs.<mod>`) and its display function called inside the Streamlit app.
 """
 from __future__ import annotations
 
+import ast
 import importlib
-import inspect
 import pkgutil
 import streamlit as st  # type: ignore
 import os
-from typing import Callable, Dict, List
+import sys
+from typing import Dict, List, Tuple
 
 
-def discover_docs_displayables() -> Dict[str, Callable]:
+def _find_display_functions(path: str) -> List[str]:
+    """Return the `display_*` function names exposed by a source file.
+
+    If the module declares a literal `__all__`, its `display_*` entries are used directly;
+    otherwise top-level function definitions are scanned. Only the AST is inspected, so the
+    module (and its heavy dependencies) is not imported.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and any(isinstance(t, ast.Name) and t.id == "__all__" for t in node.targets)
+            and isinstance(node.value, (ast.List, ast.Tuple))
+        ):
+            return [
+                elt.value
+                for elt in node.value.elts
+                if isinstance(elt, ast.Constant) and isinstance(elt.value, str) and elt.value.startswith("display_")
+            ]
+
+    return [
+        node.name
+        for node in tree.body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("display_")
+    ]
+
+
+@st.cache_resource(show_spinner=False)
+def discover_docs_displayables() -> Dict[str, Tuple[str, str]]:
     """Discover display callables in modules under the `docs` package.
 
-    Returns a mapping label -> callable.
+    Modules are parsed rather than imported; the selected one is imported by
+    `run_docs_runner` on demand. The result is cached per process.
+
+    Returns a mapping label -> (module_name, function_name).
     """
-    results: Dict[str, Callable] = {}
+    results: Dict[str, Tuple[str, str]] = {}
 
     # Ensure docs is importable
     try:
@@ -32,18 +66,15 @@ def discover_docs_displayables() -> Dict[str, Callable]:
     pkg = docs  # type: ignore
     for finder, name, ispkg in pkgutil.iter_modules(pkg.__path__):
         full_name = f"docs.{name}"
+        path = os.path.join(finder.path, name, "__init__.py") if ispkg else os.path.join(finder.path, f"{name}.py")
         try:
-            mod = importlib.import_module(full_name)
+            func_names = _find_display_functions(path)
         except Exception as e:
             # Don't raise; show a warning and continue
-            st.warning(f"No se pudo importar {full_name}: {e}")
+            st.warning(f"No se pudo analizar {full_name}: {e}")
             continue
 
-        # Find callables that look like "display_..."
-        for attr_name, attr in inspect.getmembers(mod, inspect.isfunction):
-            if attr_name.startswith("display_"):
-                label = f"{name}::{attr_name}"
-                results[label] = attr
+        results.update({f"{name}::{attr_name}": (full_name, attr_name) for attr_name in func_names})
 
     return results
 
@@ -56,8 +87,21 @@ def run_docs_runner():
         return
 
     choice = st.sidebar.selectbox("Selecciona vista (docs)", list(displayables.keys()))
-    func = displayables.get(choice)
-    if func:
+    target = displayables.get(choice)
+    if target:
+        module_name, func_name = target
+        # Fast path: after the first selection the module is already loaded
+        mod = sys.modules.get(module_name)
+        if mod is None:
+            try:
+                mod = importlib.import_module(module_name)
+            except Exception as e:
+                st.error(f"No se pudo importar {module_name}: {e}")
+                return
+        func = getattr(mod, func_name, None)
+        if func is None:
+            st.error(f"{module_name} no define {func_name}")
+            return
         try:
             func()
         except Exception as e:
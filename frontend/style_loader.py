@@ -7,6 +7,20 @@ import streamlit as st
 from pathlib import Path
 
 
+@st.cache_data(show_spinner=False)
+def _read_text(path, mtime):
+    """
+    Read a static asset from disk, cached across reruns.
+    
+    Args:
+        path (str): Absolute path of the asset
+        mtime (float): Modification time, part of the cache key so edited
+            files are re-read
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
 def load_css_file(css_filename):
     """
     Load an external CSS file and inject it into Streamlit.
@@ -17,9 +31,8 @@ def load_css_file(css_filename):
     css_path = Path(__file__).parent / "assets" / css_filename
     
     if css_path.exists():
-        with open(css_path, "r", encoding="utf-8") as f:
-            css_content = f.read()
-            st.markdown(f"<style>{css_content}</style>", unsafe_allow_html=True)
+        css_content = _read_text(str(css_path), css_path.stat().st_mtime)
+        st.markdown(f"<style>{css_content}</style>", unsafe_allow_html=True)
     else:
         st.warning(f"⚠️ CSS file not found: {css_filename}")
 
@@ -29,9 +42,8 @@ def load_particles_background():
     js_path = Path(__file__).parent / "assets" / "particles.js"
     
     if js_path.exists():
-        with open(js_path, "r", encoding="utf-8") as f:
-            js_content = f.read()
-            st.markdown(f"<script>{js_content}</script>", unsafe_allow_html=True)
+        js_content = _read_text(str(js_path), js_path.stat().st_mtime)
+        st.markdown(f"<script>{js_content}</script>", unsafe_allow_html=True)
     else:
         st.warning("⚠️ Particles JS file not found")
 
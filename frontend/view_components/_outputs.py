@@ -9,12 +9,19 @@ from the frontend, supporting multiple configuration methods:
 """
 
 import os
+from functools import lru_cache
 
+_SCRIPT_DIR = os.path.dirname(__file__)
 
+
+@lru_cache(maxsize=1)
 def get_outputs_dir() -> str:
     """
     Resolve the orchestrator outputs directory.
     
+    The result is memoized for the lifetime of the process, so the
+    environment lookup and directory checks only run on the first call.
+    
     Priority order:
     1. Environment variable PIXELY_OUTPUTS_DIR
     2. Container path /app/orchestrator/outputs
@@ -23,20 +30,13 @@ def get_outputs_dir() -> str:
     Returns:
         Path to the outputs directory containing JSON analysis results.
     """
-    # Check environment variable first
-    env_outputs = os.environ.get("PIXELY_OUTPUTS_DIR")
-    if env_outputs and os.path.isdir(env_outputs):
-        return env_outputs
-
-    # Check container mount path
-    container_path = "/app/orchestrator/outputs"
-    if os.path.isdir(container_path):
-        return container_path
-
-    # Fallback: relative path from this script
-    script_dir = os.path.dirname(__file__)
-    # Navigate to project root, then to orchestrator/outputs
-    relative_path = os.path.join(script_dir, "..", "..", "orchestrator", "outputs")
-    resolved_path = os.path.abspath(relative_path)
+    candidates = (
+        os.environ.get("PIXELY_OUTPUTS_DIR"),  # Environment variable first
+        "/app/orchestrator/outputs",           # Container mount path
+    )
+    for candidate in candidates:
+        if candidate and os.path.isdir(candidate):
+            return candidate
 
-    return resolved_path
+    # Fallback: relative path from this script to project root, then orchestrator/outputs
+    return os.path.abspath(os.path.join(_SCRIPT_DIR, "..", "..", "orchestrator", "outputs"))
@@ -4,10 +4,34 @@ Provides backward compatibility during migration.
 """
 
 import streamlit as st
-import json
 import os
 from typing import Optional, Dict, Any
 
+# orjson parses bytes directly and is several times faster; stdlib json as fallback
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+
+@st.cache_data(show_spinner=False)
+def _load_json(path: str, mtime: float) -> Dict[str, Any]:
+    """
+    Parse a JSON analysis file, cached across reruns.
+    
+    Args:
+        path: Absolute path of the JSON file
+        mtime: File modification time, part of the cache key so a re-run
+            analysis is picked up
+    
+    Returns:
+        Parsed JSON dict
+    """
+    with open(path, "rb") as f:
+        return _loads(f.read())
+
 
 def load_from_api_or_file(
     api_loader_func,
@@ -32,13 +56,12 @@ def load_from_api_or_file(
     
     # Fallback to local file (for development/backward compatibility)
     try:
-        from .._outputs import get_outputs_dir
+        from ._outputs import get_outputs_dir
         outputs_dir = get_outputs_dir()
         json_path = os.path.join(outputs_dir, json_filename)
         
         if os.path.exists(json_path):
-            with open(json_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return _load_json(json_path, os.path.getmtime(json_path))
     except Exception:
         pass
     
@@ -0,0 +1,26 @@
+"""
+Plotly layout templates shared by the view components.
+"""
+
+import plotly.graph_objects as go  # type: ignore
+import plotly.io as pio  # type: ignore
+
+
+def extend_default_template(**layout) -> go.layout.Template:
+    """
+    Copy of the active default template with layout overrides applied.
+
+    Passing a bare go.layout.Template to a figure replaces the default
+    template (the "streamlit" one once Streamlit is imported) instead of
+    extending it, dropping its trace and layout defaults. Building from a copy
+    keeps them while still validating the shared overrides only once.
+
+    Args:
+        **layout: Layout properties merged into the template layout
+
+    Returns:
+        New go.layout.Template
+    """
+    template = go.layout.Template(pio.templates[pio.templates.default])
+    template.layout.update(layout)
+    return template
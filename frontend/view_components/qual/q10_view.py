@@ -1,6 +1,6 @@
 """Q10 View: Executive Summary with Strategic KPIs and Alerts"""
 import streamlit as st # type: ignore
-import pandas as pd
+import numpy as np
 import plotly.graph_objects as go  # type: ignore
 from view_components.data_loader import load_q10_data as api_load_q10
 from view_components.compat_loader import load_from_api_or_file
@@ -9,6 +9,114 @@ def load_q10_data():
     """Load Q10 data from API or local file (backward compatibility)."""
     return load_from_api_or_file(api_load_q10, "q10_resumen_ejecutivo.json", "Q10")
 
+# Card for a dominant topic (filled with str.format)
+_TOPICO_CARD = (
+    "<div style='background-color:{color}; color:white; padding:20px; border-radius:8px; "
+    "text-align:center; font-size:18px; font-weight:bold;'>{topico}</div>"
+)
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def _make_sentiment_pie(pos, neg, neu):
+    """Build the sentiment distribution pie (cached on the three percentages)."""
+    sentimientos = ['Positivo', 'Negativo', 'Neutral']
+    colores = ['#2ecc71', '#e74c3c', '#95a5a6']
+    
+    fig_pie = go.Figure(data=[go.Pie(
+        labels=sentimientos,
+        values=np.array([pos, neg, neu], dtype=np.float32),
+        marker=dict(colors=colores),
+        textposition='inside',
+        textinfo='label+percent',
+        hovertemplate='<b>%{label}</b><br>%{value:.0f}%<extra></extra>'
+    )])
+    
+    fig_pie.update_layout(
+        title="Sentimiento General",
+        height=400
+    )
+    return fig_pie
+
+def _kpi_grid(kpis_fila):
+    """Render a row of (label, value, delta) KPIs as one HTML grid, styled like st.metric."""
+    # Single-line HTML: blank/indented lines would break the markdown HTML block
+    cards = "".join(
+        "<div style='padding:4px 0;'>"
+        f"<div style='font-size:14px; opacity:0.8;'>{label}</div>"
+        f"<div style='font-size:36px; line-height:1.3;'>{value}</div>"
+        + (f"<div style='font-size:14px; color:#21c354;'>↑ {delta}</div>" if delta else "")
+        + "</div>"
+        for label, value, delta in kpis_fila
+    )
+    return (
+        f"<div style='display:grid; grid-template-columns:repeat({len(kpis_fila)}, 1fr); "
+        f"gap:1rem; margin-bottom:1rem;'>{cards}</div>"
+    )
+
+def _kpi_section(kpis):
+    """KPI grid + sentiment pie."""
+    pos = kpis.get('sentimiento_positivo_pct', 0)
+    neg = kpis.get('sentimiento_negativo_pct', 0)
+    neu = kpis.get('sentimiento_neutral_pct', 0)
+    vol = kpis.get('volumen_menciones', 0)
+    er = kpis.get('engagement_rate', 0)
+    
+    # All 7 KPIs rendered as a single HTML block (one element instead of 2 columns + 7 metrics)
+    fila_1 = [
+        ("Menciones Totales", f"{vol:,}", None),
+        ("Sentimiento Positivo", f"{pos}%", "Strong"),
+        ("Engagement Rate", f"{er * 100:.1f}%", None),
+        ("Anomalías Detectadas", kpis.get('anomalias_detectadas', 0),
+         f"{kpis.get('influenciadores_clave', 0)} influenciadores clave"),
+    ]
+    fila_2 = [
+        ("Sentimiento Negativo", f"{neg}%", None),
+        ("Sentimiento Neutral", f"{neu}%", None),
+        ("Oportunidades Detectadas", kpis.get('oportunidades_detectadas', 0), None),
+    ]
+    st.markdown(_kpi_grid(fila_1) + _kpi_grid(fila_2), unsafe_allow_html=True)
+    
+    # Sentiment distribution pie
+    st.markdown("### Distribución de Sentimientos")
+    fig_pie = _make_sentiment_pie(pos, neg, neu)
+    
+    st.plotly_chart(fig_pie, use_container_width=True)
+
+def _roadmap_section(urgencias):
+    """Roadmap of tasks grouped by urgency."""
+    if urgencias:
+        for urgencia_label, tareas in urgencias.items():
+            # Convert label to readable format
+            label_display = urgencia_label.replace('_', ' ').title()
+            
+            with st.container():
+                if "CRÍTICA" in urgencia_label:
+                    st.error(f"### 🔴 {label_display}")
+                elif "SEMANA_1" in urgencia_label:
+                    st.warning(f"### 🟠 {label_display}")
+                else:
+                    st.info(f"### 🟡 {label_display}")
+                
+                for tarea in tareas:
+                    st.markdown(f"- {tarea}")
+                
+                st.divider()
+
+def _topics_section(topicos):
+    """Dominant topics as colored cards."""
+    if topicos:
+        topicos_dict = {
+            'Sostenibilidad': '#1abc9c',
+            'Transparencia': '#3498db',
+            'Innovación': '#f39c12'
+        }
+        
+        # Rows of 3 cards, so no topic is dropped when there are more than 3
+        for start in range(0, len(topicos), 3):
+            for col, topico in zip(st.columns(3), topicos[start:start + 3]):
+                with col:
+                    color = topicos_dict.get(topico, '#34495e')
+                    st.markdown(_TOPICO_CARD.format(color=color, topico=topico), unsafe_allow_html=True)
+
 def display_q10_resumen_ejecutivo():
     st.title("📊 Q10: Resumen Ejecutivo - Dashboard Estratégico")
     
@@ -86,79 +194,7 @@ def display_q10_resumen_ejecutivo():
     # ========================================================================
     st.markdown("## 📈 KPIs Principales")
     
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric(
-            "Menciones Totales",
-            f"{kpis.get('volumen_menciones', 0):,}"
-        )
-    
-    with col2:
-        st.metric(
-            "Sentimiento Positivo",
-            f"{kpis.get('sentimiento_positivo_pct', 0)}%",
-            delta="Strong"
-        )
-    
-    with col3:
-        st.metric(
-            "Engagement Rate",
-            f"{kpis.get('engagement_rate', 0)* 100:.1f}%"
-        )
-    
-    with col4:
-        st.metric(
-            "Anomalías Detectadas",
-            kpis.get('anomalias_detectadas', 0),
-            delta=f"{kpis.get('influenciadores_clave', 0)} influenciadores clave"
-        )
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.metric(
-            "Sentimiento Negativo",
-            f"{kpis.get('sentimiento_negativo_pct', 0)}%"
-        )
-    
-    with col2:
-        st.metric(
-            "Sentimiento Neutral",
-            f"{kpis.get('sentimiento_neutral_pct', 0)}%"
-        )
-    
-    with col3:
-        st.metric(
-            "Oportunidades Detectadas",
-            kpis.get('oportunidades_detectadas', 0)
-        )
-    
-    # Sentiment distribution pie
-    st.markdown("### Distribución de Sentimientos")
-    sentimientos = ['Positivo', 'Negativo', 'Neutral']
-    valores = [
-        kpis.get('sentimiento_positivo_pct', 0),
-        kpis.get('sentimiento_negativo_pct', 0),
-        kpis.get('sentimiento_neutral_pct', 0)
-    ]
-    colores = ['#2ecc71', '#e74c3c', '#95a5a6']
-    
-    fig_pie = go.Figure(data=[go.Pie(
-        labels=sentimientos,
-        values=valores,
-        marker=dict(colors=colores),
-        textposition='inside',
-        textinfo='label+percent',
-        hovertemplate='<b>%{label}</b><br>%{value:.0f}%<extra></extra>'
-    )])
-    
-    fig_pie.update_layout(
-        title="Sentimiento General",
-        height=400
-    )
-    
-    st.plotly_chart(fig_pie, use_container_width=True)
+    _kpi_section(kpis)
     
     st.markdown("---")
     
@@ -187,23 +223,7 @@ def display_q10_resumen_ejecutivo():
     # ========================================================================
     st.markdown("## 🗓️ Roadmap de Acción por Urgencia")
     
-    if urgencias:
-        for urgencia_label, tareas in urgencias.items():
-            # Convert label to readable format
-            label_display = urgencia_label.replace('_', ' ').title()
-            
-            with st.container():
-                if "CRÍTICA" in urgencia_label:
-                    st.error(f"### 🔴 {label_display}")
-                elif "SEMANA_1" in urgencia_label:
-                    st.warning(f"### 🟠 {label_display}")
-                else:
-                    st.info(f"### 🟡 {label_display}")
-                
-                for tarea in tareas:
-                    st.markdown(f"- {tarea}")
-                
-                st.divider()
+    _roadmap_section(urgencias)
     
     # ========================================================================
     # COMPONENTE 7: TÓPICOS DOMINANTES
@@ -211,34 +231,7 @@ def display_q10_resumen_ejecutivo():
     st.markdown("## 💡 Tópicos Dominantes Identificados")
     
     topicos = kpis.get('topics_dominantes', [])
-    if topicos:
-        col1, col2, col3 = st.columns(3)
-        
-        topicos_dict = {
-            'Sostenibilidad': '#1abc9c',
-            'Transparencia': '#3498db',
-            'Innovación': '#f39c12'
-        }
-        
-        for idx, topico in enumerate(topicos):
-            with [col1, col2, col3][idx]:
-                color = topicos_dict.get(topico, '#34495e')
-                st.markdown(
-                    f"""
-                    <div style='
-                        background-color:{color};
-                        color:white;
-                        padding:20px;
-                        border-radius:8px;
-                        text-align:center;
-                        font-size:18px;
-                        font-weight:bold;
-                    '>
-                    {topico}
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
+    _topics_section(topicos)
     
     st.markdown("---")
     
@@ -1,15 +1,52 @@
 import streamlit as st  # type: ignore
+import numpy as np
 import pandas as pd
 from view_components.data_loader import load_q1_data as api_load_q1
 from view_components.compat_loader import load_from_api_or_file
 import plotly.graph_objects as go  # type: ignore
 
+# Prefixes of Plutchik emotion keys (used to filter out sentiment aggregates)
+_EMO_PREFIXES = ("alegr", "conf", "sorp", "triste", "enojo", "mied", "disgust", "antic")
+
 
 def load_q1_data():
     """Load Q1 data from API or local file (backward compatibility)."""
     return load_from_api_or_file(api_load_q1, "q1_emociones.json", "Q1")
 
 
+@st.cache_data(show_spinner=False)
+def _build_posts_frame(per_posts):
+    """Build the per-post DataFrame with one float column per emotion.
+
+    Cached across reruns.
+    """
+    df = pd.DataFrame(per_posts)
+    emo_df = pd.json_normalize(df["emociones"].tolist()).fillna(0)
+    df = pd.concat([df.drop(columns=["emociones"]), emo_df], axis=1)
+    return df
+
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def _make_emotion_bar(emotion_items):
+    """Global emotion bar chart, cached on the (emotion, score) tuple."""
+    names, vals = zip(*emotion_items)
+    fig = go.Figure([go.Bar(x=list(names), y=list(vals))])
+    fig.update_layout(xaxis_title="Emoción", yaxis_title="Puntuación promedio")
+    return fig
+
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def _make_radar(emotion_items, post_link):
+    """Per-post emotion radar, cached on the (emotion, score) tuple and post."""
+    # ndarrays take Plotly's fast serialization path
+    n = len(emotion_items)
+    names = np.fromiter((k for k, _ in emotion_items), dtype=object, count=n)
+    vals = np.fromiter((v for _, v in emotion_items), dtype=np.float32, count=n)
+    fig = go.Figure(data=go.Scatterpolar(r=vals, theta=names, fill="toself"))
+    fig.update_layout(polar=dict(radialaxis=dict(range=[0, 1])), showlegend=False)
+    return fig
+
+
 def display_q1_emotions():
     """Main Q1 view: global emotion distribution + per-post radar + top-5 ranking."""
     st.title("😢 Q1 — Análisis de Emociones (Plutchik)")
@@ -41,10 +78,9 @@ def display_q1_emotions():
     global_emotions = results.get("resumen_global_emociones", {})
     if global_emotions:
         # Remove sentiment aggregates if present
-        emotion_scores = {k: v for k, v in global_emotions.items() if k.lower().startswith(("alegr", "conf", "sorp", "triste", "enojo", "mied", "disgust", "antic")) or len(k) < 30}
+        emotion_scores = {k: v for k, v in global_emotions.items() if len(k) < 30 or k.lower().startswith(_EMO_PREFIXES)}
         if emotion_scores:
-            fig = go.Figure([go.Bar(x=list(emotion_scores.keys()), y=list(emotion_scores.values()))])
-            fig.update_layout(xaxis_title="Emoción", yaxis_title="Puntuación promedio")
+            fig = _make_emotion_bar(tuple(emotion_scores.items()))
             st.plotly_chart(fig)
             
             # Descripción del gráfico
@@ -84,18 +120,16 @@ def display_q1_emotions():
         st.info("No hay datos por publicación para mostrar.")
         return
 
-    df = pd.DataFrame(per_posts)
+    df = _build_posts_frame(per_posts)
     st.header("Análisis por Publicación")
     post = st.selectbox("Selecciona publicación", df["post_link"].tolist())
     selected = df[df["post_link"] == post].iloc[0]
 
     st.write(f"**Resumen:** {selected.get('resumen_emocional', 'N/A')}")
-    emociones = selected.get("emociones", {})
+    # The post's own emotions only: the frame columns add 0s for emotions it lacks
+    emociones = per_posts[selected.name].get("emociones", {})
     if emociones:
-        names = list(emociones.keys())
-        vals = list(emociones.values())
-        fig = go.Figure(data=go.Scatterpolar(r=vals, theta=names, fill="toself"))
-        fig.update_layout(polar=dict(radialaxis=dict(range=[0, 1])), showlegend=False)
+        fig = _make_radar(tuple(emociones.items()), post)
         st.plotly_chart(fig)
         
         # Descripción del gráfico radar
@@ -124,7 +158,6 @@ def display_q1_emotions():
     st.header("Top 5 publicaciones por emoción")
     available = list(per_posts[0].get("emociones", {}).keys())
     emotion = st.selectbox("Elige emoción", available)
-    df[emotion] = df["emociones"].apply(lambda d: d.get(emotion, 0))
     top5 = df.nlargest(5, emotion)[["post_link", emotion, "resumen_emocional"]]
     st.dataframe(top5.rename(columns={emotion: f"Puntuación ({emotion})", "post_link": "URL"}))
     
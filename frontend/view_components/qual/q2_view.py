@@ -1,14 +1,240 @@
 """Q2 View: Personality Analysis Display - 3 Gráficos Según Especificación Aaker"""
 import streamlit as st # type: ignore
-import pandas as pd
+import numpy as np
 import plotly.graph_objects as go  # type: ignore
 from view_components.data_loader import load_q2_data as api_load_q2
 from view_components.compat_loader import load_from_api_or_file
+from view_components.ranking import top_k
+from view_components.plotly_templates import extend_default_template
 
 def load_q2_data():
     """Load Q2 data from API or local file (backward compatibility)."""
     return load_from_api_or_file(api_load_q2, "q2_personalidad.json", "Q2")
 
+@st.cache_data(show_spinner=False)
+def _build_posts_data(per_post):
+    """
+    Per-post data shared by Gráfico 2 and Gráfico 3 (cached across reruns).
+    
+    Built straight from the list of dicts, without a DataFrame. Returns a dict with:
+    - trait_names: Aaker traits present in any post, the columns of traits_arr
+    - traits_arr: float32 matrix, one row per post, one column per trait
+    - urls: post links
+    - short50 / short60: truncated link labels for chart axes and titles/tables
+    - url_to_pos: link -> row position, for O(1) selectbox lookups
+    """
+    # Union of trait keys over all posts (first-seen order), not just the first post's
+    trait_names = list(dict.fromkeys(
+        t for p in per_post if isinstance(p.get("rasgos_aaker"), dict) for t in p["rasgos_aaker"]
+    ))
+    traits_arr = np.array(
+        [
+            [p["rasgos_aaker"].get(t, 0.0) for t in trait_names] if isinstance(p.get("rasgos_aaker"), dict)
+            else [0.0] * len(trait_names)
+            for p in per_post
+        ],
+        dtype=np.float32  # trait scores are low-precision; half the memory of float64
+    ).reshape(len(per_post), len(trait_names))
+    urls = [p.get("link", "") for p in per_post]
+    short50 = [u[:50] for u in urls]
+    short60 = [u[:60] + "..." for u in urls]
+    url_to_pos = {}
+    for i, u in enumerate(urls):
+        url_to_pos.setdefault(u, i)  # first occurrence wins, as the old mask lookup did
+    return {
+        "trait_names": trait_names,
+        "traits_arr": traits_arr,
+        "urls": urls,
+        "short50": short50,
+        "short60": short60,
+        "url_to_pos": url_to_pos,
+    }
+
+# Static chart descriptions (module constants, not rebuilt per rerun)
+_G1_DESC = """
+**📊 Qué estamos viendo:**
+Este gráfico de barras muestra el perfil global de personalidad de tu marca según la percepción de la audiencia. Los cinco rasgos de Aaker son: Sinceridad (confiable, honesto), Emoción (energético, apasionado), Competencia (confiable, líder), Sofisticación (elegante, refinado) y Rudeza (resistente, aventurero). Cada barra representa la intensidad con la que la audiencia asocia tu marca con ese rasgo.
+
+**🔍 Cómo se midió:**
+Se analizaron todos los comentarios de la audiencia utilizando el Framework de Personalidad de Marca de Jennifer Aaker. Para cada comentario, se identificaron palabras clave, tono de voz y contexto que indicaban asociación con cada uno de los cinco rasgos. Luego se calculó una puntuación promedio por rasgo a nivel global.
+
+**💡 Para qué se usa:**
+Este perfil global te permite:
+- Validar si tu marca se percibe como pretendías (¿Eres visto como "Sincero" o como "Sofisticado"?).
+- Identificar inconsistencias entre tu identidad de marca deseada y la percibida.
+- Desarrollar estrategias de contenido que refuercen dimensiones fuertes.
+- Corregir deficiencias en dimensiones importantes para tu marca.
+- Crear mensajes más resonantes con la audiencia.
+
+**📌 Tips para interpretarlo:**
+- Los rasgos con barras altas son tus fortalezas; refuérzalos en futuro contenido.
+- Los rasgos con barras bajas podrían ser oportunidades (si deseas desarrollarlos) o puntos seguros de tu identidad.
+- Las marcas líderes tienen perfiles de personalidad únicos y consistentes.
+- Un perfil "equilibrado" puede indicar confusión; considera fortalecer 2-3 rasgos principales.
+"""
+
+_G2_DESC_TMPL = """
+**📊 Qué estamos viendo:**
+Un ranking de las 5 publicaciones que generaron la mayor intensidad del rasgo "{trait}" que seleccionaste. Cada barra representa qué tan fuerte fue ese rasgo de personalidad en los comentarios de esa publicación específica.
+
+**🔍 Cómo se midió:**
+Para cada publicación, se analizaron todos sus comentarios y se calculó la puntuación promedio del rasgo "{trait}". Luego se ordenaron todas las publicaciones de mayor a menor intensidad y se seleccionaron las top 5.
+
+**💡 Para qué se usa:**
+Este ranking te permite:
+- Identificar qué contenido refuerza mejor cada rasgo de personalidad deseado.
+- Replicar patrones de éxito: ¿Qué hace que ciertas publicaciones generen más "Sinceridad" o "Sofisticación"?
+- Ajustar tu estrategia de contenido para fortalecer rasgos específicos.
+- Comparar el desempeño emocional de diferentes tipos de posts.
+
+**📌 Tips para interpretarlo:**
+- Las publicaciones en la parte superior son "modelos a replicar" para ese rasgo.
+- Si buscas fortalecer "Competencia", analiza qué tienen en común las top 5 posts de competencia.
+- Considera el tipo de contenido (video, texto, imagen) que mejor activa cada rasgo.
+- Un rasgo muy concentrado en pocas publicaciones indica inconsistencia de marca.
+"""
+
+_G3_DESC = """
+**📊 Qué estamos viendo:**
+Un gráfico de radar (también llamado "rueda de Aaker") que muestra el perfil completo de personalidad de esta publicación específica. Cada eje representa un rasgo de Aaker, y la distancia del centro indica la intensidad de ese rasgo en los comentarios de la publicación.
+
+**🔍 Cómo se midió:**
+Se extrajeron todos los comentarios asociados a esta publicación y se analizó su contenido para determinar qué dimensiones de personalidad fueron activadas o reforzadas. Se calculó un promedio para cada rasgo basado en los comentarios de la publicación.
+
+**💡 Para qué se usa:**
+Este análisis granular por publicación te permite:
+- Diagnosticar exactamente qué personalidad de marca proyecta cada contenido.
+- Comparar diferentes tipos de posts: ¿El post A enfatiza Sinceridad mientras que el post B enfatiza Sofisticación?
+- Optimizar futuras publicaciones basándote en respuestas emocionales específicas.
+- Identificar si un post es coherente con tu identidad de marca deseada.
+- Detectar posts que generan "ruido de personalidad" (muchos rasgos débiles en lugar de pocos fuertes).
+
+**📌 Tips para interpretarlo:**
+- Un radar "redondeado" (todos los ejes expandidos) indica contenido que activa múltiples rasgos (generalmente más viral).
+- Un radar "puntiagudo" (con solo 1-2 picos) indica contenido muy específico en tono (claridad de mensaje).
+- La "personalidad dominante" es el rasgo más fuerte; verifica si alinea con tu identidad deseada.
+- Compara radares de posts exitosos vs posts con bajo engagement para detectar patrones.
+"""
+
+# Shared layout defaults on top of the active default template, validated once at import
+_BAR_TEMPLATE = extend_default_template(showlegend=False, height=450)
+_RADAR_TEMPLATE = extend_default_template(
+    showlegend=False,
+    height=500,
+    polar=dict(radialaxis=dict(visible=True))
+)
+
+@st.cache_data(show_spinner=False)
+def _build_global_fig(dims_items):
+    """Gráfico 1 figure, cached on the (trait, value) tuple (it depends on no widget)."""
+    names, vals = zip(*dims_items)
+    trace = go.Bar(x=list(names), y=list(vals), marker=dict(color='steelblue', line=dict(width=0)))
+    return go.Figure([trace], layout=dict(
+        template=_BAR_TEMPLATE,
+        title="Distribución Global de Rasgos Aaker",
+        xaxis_title="Rasgo de Personalidad",
+        yaxis_title="Intensidad Promedio"
+    ))
+
+@st.cache_data(show_spinner=False)
+def _build_top5_fig(selected_trait, labels, scores):
+    """Gráfico 2 figure, cached per trait and plotted values."""
+    return go.Figure([go.Bar(
+        y=labels,
+        x=scores,
+        orientation='h',
+        marker_color='coral'
+    )], layout=dict(
+        template=_BAR_TEMPLATE,
+        title=f"Top 5 Publicaciones por Rasgo: {selected_trait}",
+        xaxis_title=f"Intensidad de {selected_trait}",
+        yaxis_title="Publicación (URL acortada)",
+        height=400
+    ))
+
+@st.cache_data(show_spinner=False)
+def _build_radar_fig(title_label, trait_names, row):
+    """Gráfico 3 figure, cached per post label and its own trait values."""
+    return go.Figure(data=go.Scatterpolar(
+        r=row,
+        theta=trait_names,
+        fill='toself',
+        marker_color='mediumseagreen'
+    ), layout=dict(
+        template=_RADAR_TEMPLATE,
+        polar=dict(radialaxis=dict(range=[0, row.max() * 1.1])),
+        title=f"Perfil Aaker: {title_label}"
+    ))
+
+@st.fragment
+def _g2(posts):
+    """Gráfico 2: Top 5 posts by the selected trait (reruns on its own)."""
+    available_traits = posts["trait_names"]
+    short50 = posts["short50"]
+    short60 = posts["short60"]
+    
+    selected_trait = st.selectbox(
+        "Selecciona un rasgo de Aaker para ver los Top 5 posts que lo generaron:",
+        available_traits,
+        key="trait_selector"
+    )
+
+    # Get top 5 (ties keep post order, as nlargest did)
+    scores = posts["traits_arr"][:, available_traits.index(selected_trait)]
+    idx = top_k(scores)
+
+    # Create horizontal bar chart
+    fig = _build_top5_fig(selected_trait, [short50[i] for i in idx], scores[idx])
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Show detailed table
+    st.write("**Detalle de Top 5:**")
+    display_df = {
+        'URL': [short60[i] for i in idx],
+        f'{selected_trait} (Intensidad)': scores[idx].tolist()
+    }
+    st.dataframe(display_df, use_container_width=True)
+
+    # Descripción Gráfico 2
+    st.markdown(_G2_DESC_TMPL.format(trait=selected_trait))
+
+@st.fragment
+def _g3(posts, per_post):
+    """Gráfico 3: Aaker radar of the selected post (reruns on its own)."""
+    short60 = posts["short60"]
+    
+    selected_url = st.selectbox(
+        "Selecciona una publicación para ver su perfil de personalidad completo:",
+        posts["urls"],
+        key="post_selector"
+    )
+    selected_pos = posts["url_to_pos"][selected_url]
+    selected_post = per_post[selected_pos]
+
+    traits = selected_post.get("rasgos_aaker", {})
+    if traits and isinstance(traits, dict):
+        # The post's own traits only: the union matrix would add 0s for traits it lacks
+        trait_names = list(traits)
+        row = np.array(list(traits.values()), dtype=np.float32)
+
+        # Create radar chart for more visual impact
+        fig = _build_radar_fig(short60[selected_pos], trait_names, row)
+        st.plotly_chart(fig, use_container_width=True)
+
+        # Show summary stats
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Tono Percibido", selected_post.get('tono_percibido', 'N/A'))
+        with col2:
+            st.metric("Rasgo Máximo", trait_names[row.argmax()])
+        with col3:
+            st.metric("Intensidad Promedio", f"{row.mean():.2f}")
+
+        # Descripción Gráfico 3
+        st.markdown(_G3_DESC)
+    else:
+        st.info("No personality traits available for this post.")
+
 def display_q2_personalidad():
     st.title("👤 Q2: Análisis de Personalidad de Marca (Aaker)")
     
@@ -43,38 +269,12 @@ def display_q2_personalidad():
         # Create bar chart for personality dimensions
         dims = {k: v for k, v in global_personality.items() if isinstance(v, (int, float))}
         if dims:
-            fig = go.Figure([go.Bar(x=list(dims.keys()), y=list(dims.values()), marker_color='steelblue')])
-            fig.update_layout(
-                title="Distribución Global de Rasgos Aaker",
-                xaxis_title="Rasgo de Personalidad",
-                yaxis_title="Intensidad Promedio",
-                showlegend=False,
-                height=450
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            fig = _build_global_fig(tuple(dims.items()))
+            # Static chart: no mode bar, so no toolbar handlers are set up client-side
+            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
             
             # Descripción Gráfico 1
-            st.markdown("""
-            **📊 Qué estamos viendo:**
-            Este gráfico de barras muestra el perfil global de personalidad de tu marca según la percepción de la audiencia. Los cinco rasgos de Aaker son: Sinceridad (confiable, honesto), Emoción (energético, apasionado), Competencia (confiable, líder), Sofisticación (elegante, refinado) y Rudeza (resistente, aventurero). Cada barra representa la intensidad con la que la audiencia asocia tu marca con ese rasgo.
-
-            **🔍 Cómo se midió:**
-            Se analizaron todos los comentarios de la audiencia utilizando el Framework de Personalidad de Marca de Jennifer Aaker. Para cada comentario, se identificaron palabras clave, tono de voz y contexto que indicaban asociación con cada uno de los cinco rasgos. Luego se calculó una puntuación promedio por rasgo a nivel global.
-
-            **💡 Para qué se usa:**
-            Este perfil global te permite:
-            - Validar si tu marca se percibe como pretendías (¿Eres visto como "Sincero" o como "Sofisticado"?).
-            - Identificar inconsistencias entre tu identidad de marca deseada y la percibida.
-            - Desarrollar estrategias de contenido que refuercen dimensiones fuertes.
-            - Corregir deficiencias en dimensiones importantes para tu marca.
-            - Crear mensajes más resonantes con la audiencia.
-
-            **📌 Tips para interpretarlo:**
-            - Los rasgos con barras altas son tus fortalezas; refuérzalos en futuro contenido.
-            - Los rasgos con barras bajas podrían ser oportunidades (si deseas desarrollarlos) o puntos seguros de tu identidad.
-            - Las marcas líderes tienen perfiles de personalidad únicos y consistentes.
-            - Un perfil "equilibrado" puede indicar confusión; considera fortalecer 2-3 rasgos principales.
-            """)
+            st.markdown(_G1_DESC)
     else:
         st.info("No global personality data available")
     
@@ -84,74 +284,10 @@ def display_q2_personalidad():
     st.header("📊 Gráfico 2: Top 5 Publicaciones por Rasgo")
     per_post = results.get("analisis_por_publicacion", [])
     if per_post:
-        df_posts = pd.DataFrame(per_post)
-        
-        # Extract all available traits from first post
-        first_post_traits = df_posts.iloc[0].get("rasgos_aaker", {})
-        available_traits = list(first_post_traits.keys()) if isinstance(first_post_traits, dict) else []
+        posts = _build_posts_data(per_post)
         
-        if available_traits:
-            selected_trait = st.selectbox(
-                "Selecciona un rasgo de Aaker para ver los Top 5 posts que lo generaron:",
-                available_traits,
-                key="trait_selector"
-            )
-            
-            # Extract trait scores for all posts
-            df_posts['trait_score'] = df_posts['rasgos_aaker'].apply(
-                lambda x: x.get(selected_trait, 0) if isinstance(x, dict) else 0
-            )
-            
-            # Get top 5
-            top_5 = df_posts.nlargest(5, 'trait_score')[['link', 'trait_score']]
-            
-            # Create horizontal bar chart
-            fig = go.Figure([go.Bar(
-                y=top_5['link'].str[:50],
-                x=top_5['trait_score'],
-                orientation='h',
-                marker_color='coral'
-            )])
-            fig.update_layout(
-                title=f"Top 5 Publicaciones por Rasgo: {selected_trait}",
-                xaxis_title=f"Intensidad de {selected_trait}",
-                yaxis_title="Publicación (URL acortada)",
-                height=400,
-                showlegend=False
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Show detailed table
-            st.write("**Detalle de Top 5:**")
-            display_df = top_5.copy()
-            display_df['link'] = display_df['link'].str[:60] + "..."
-            display_df = display_df.rename(columns={
-                'link': 'URL',
-                'trait_score': f'{selected_trait} (Intensidad)'
-            })
-            st.dataframe(display_df, use_container_width=True)
-            
-            # Descripción Gráfico 2
-            st.markdown(f"""
-            **📊 Qué estamos viendo:**
-            Un ranking de las 5 publicaciones que generaron la mayor intensidad del rasgo "{selected_trait}" que seleccionaste. Cada barra representa qué tan fuerte fue ese rasgo de personalidad en los comentarios de esa publicación específica.
-
-            **🔍 Cómo se midió:**
-            Para cada publicación, se analizaron todos sus comentarios y se calculó la puntuación promedio del rasgo "{selected_trait}". Luego se ordenaron todas las publicaciones de mayor a menor intensidad y se seleccionaron las top 5.
-
-            **💡 Para qué se usa:**
-            Este ranking te permite:
-            - Identificar qué contenido refuerza mejor cada rasgo de personalidad deseado.
-            - Replicar patrones de éxito: ¿Qué hace que ciertas publicaciones generen más "Sinceridad" o "Sofisticación"?
-            - Ajustar tu estrategia de contenido para fortalecer rasgos específicos.
-            - Comparar el desempeño emocional de diferentes tipos de posts.
-
-            **📌 Tips para interpretarlo:**
-            - Las publicaciones en la parte superior son "modelos a replicar" para ese rasgo.
-            - Si buscas fortalecer "Competencia", analiza qué tienen en común las top 5 posts de competencia.
-            - Considera el tipo de contenido (video, texto, imagen) que mejor activa cada rasgo.
-            - Un rasgo muy concentrado en pocas publicaciones indica inconsistencia de marca.
-            """)
+        if posts["trait_names"]:
+            _g2(posts)
         else:
             st.info("No trait data available for analysis")
     else:
@@ -162,66 +298,6 @@ def display_q2_personalidad():
     # ============================================================================
     st.header("📊 Gráfico 3: Perfil Aaker por Publicación")
     if per_post:
-        df_posts = pd.DataFrame(per_post)
-        selected_url = st.selectbox(
-            "Selecciona una publicación para ver su perfil de personalidad completo:",
-            df_posts["link"].tolist(),
-            key="post_selector"
-        )
-        selected_post = df_posts[df_posts["link"] == selected_url].iloc[0]
-        
-        traits = selected_post.get("rasgos_aaker", {})
-        if traits and isinstance(traits, dict):
-            names = list(traits.keys())
-            vals = list(traits.values())
-            
-            # Create radar chart for more visual impact
-            fig = go.Figure(data=go.Scatterpolar(
-                r=vals,
-                theta=names,
-                fill='toself',
-                marker_color='mediumseagreen'
-            ))
-            fig.update_layout(
-                polar=dict(radialaxis=dict(range=[0, max(vals) * 1.1 if vals else 1])),
-                title=f"Perfil Aaker: {selected_url[:60]}...",
-                height=500,
-                showlegend=False
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Show summary stats
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Tono Percibido", selected_post.get('tono_percibido', 'N/A'))
-            with col2:
-                st.metric("Rasgo Máximo", f"{max(names, key=lambda x: traits[x]) if traits else 'N/A'}")
-            with col3:
-                st.metric("Intensidad Promedio", f"{sum(vals) / len(vals):.2f}" if vals else "N/A")
-            
-            # Descripción Gráfico 3
-            st.markdown(f"""
-            **📊 Qué estamos viendo:**
-            Un gráfico de radar (también llamado "rueda de Aaker") que muestra el perfil completo de personalidad de esta publicación específica. Cada eje representa un rasgo de Aaker, y la distancia del centro indica la intensidad de ese rasgo en los comentarios de la publicación.
-
-            **🔍 Cómo se midió:**
-            Se extrajeron todos los comentarios asociados a esta publicación y se analizó su contenido para determinar qué dimensiones de personalidad fueron activadas o reforzadas. Se calculó un promedio para cada rasgo basado en los comentarios de la publicación.
-
-            **💡 Para qué se usa:**
-            Este análisis granular por publicación te permite:
-            - Diagnosticar exactamente qué personalidad de marca proyecta cada contenido.
-            - Comparar diferentes tipos de posts: ¿El post A enfatiza Sinceridad mientras que el post B enfatiza Sofisticación?
-            - Optimizar futuras publicaciones basándote en respuestas emocionales específicas.
-            - Identificar si un post es coherente con tu identidad de marca deseada.
-            - Detectar posts que generan "ruido de personalidad" (muchos rasgos débiles en lugar de pocos fuertes).
-
-            **📌 Tips para interpretarlo:**
-            - Un radar "redondeado" (todos los ejes expandidos) indica contenido que activa múltiples rasgos (generalmente más viral).
-            - Un radar "puntiagudo" (con solo 1-2 picos) indica contenido muy específico en tono (claridad de mensaje).
-            - La "personalidad dominante" es el rasgo más fuerte; verifica si alinea con tu identidad deseada.
-            - Compara radares de posts exitosos vs posts con bajo engagement para detectar patrones.
-            """)
-        else:
-            st.info("No personality traits available for this post.")
+        _g3(posts, per_post)
     else:
         st.info("No per-publication data available")
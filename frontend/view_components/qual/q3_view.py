@@ -1,48 +1,32 @@
 """Q3 View: Topic Modeling Display - 3 Gráficos Según Especificación"""
 import streamlit as st # type: ignore
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go  # type: ignore
 from view_components.data_loader import load_q3_data as api_load_q3
 from view_components.compat_loader import load_from_api_or_file
+from view_components.ranking import top_k
+from view_components.plotly_templates import extend_default_template
 
 def load_q3_data():
     """Load Q3 data from API or local file (backward compatibility)."""
     return load_from_api_or_file(api_load_q3, "q3_topicos.json", "Q3")
 
-def display_q3_topicos():
-    st.title("💬 Q3: Análisis de Tópicos Principales")
-    
-    st.markdown("""
-    ### ¿Qué es este análisis?
-    El **Análisis de Tópicos** identifica los TEMAS principales sobre los que habla tu audiencia. No es sentimiento (positivo/negativo), sino el QUÉ: ¿Hablan de precio? ¿Calidad? ¿Sostenibilidad? ¿Servicio al cliente? Este análisis segmenta toda la conversación en clusters temáticos.
-    
-    ### ¿Por qué es relevante para tu negocio?
-    Tu audiencia solo habla de lo que les importa (y a veces, de lo que va mal). Si el 60% de la conversación es sobre "Precio" pero tu estrategia se enfoca en "Innovación", estás hablando en otro idioma. Este análisis te permite:
-    - **Alinear inversión:** Dónde va el dinero de marketing debe reflejar dónde está el ruido
-    - **Identificar crisis temprano:** Si "Problema de Calidad" crece 40% MoM, es alerta roja
-    - **Detectar oportunidades:** Si nadie habla de Sostenibilidad pero es una tendencia emergente, hay espacio
-    - **Segmentar estrategia:** Diferentes tópicos requieren diferentes mensajes
-    - **Medir influencia de cambios:** Después de un cambio de producto, ¿qué tópicos subieron/bajaron?
-    
-    ### El dato de fondo
-    Este análisis usa Topic Modeling (LDA/BERTopic) para identificar clusters de palabras que frecuentemente aparecen juntas. No es buscar keywords, sino descubrir TEMAS emergentes que tu equipo podría no haber anticipado.
-    """)
-    
-    data = load_q3_data()
-    if data is None:
-        return
-    
-    results = data.get("results", {})
-    
-    # ============================================================================
-    # GRÁFICO 1: TÓPICOS GLOBALES (BURBUJAS)
-    # ============================================================================
-    st.header("📊 Gráfico 1: Tópicos Globales")
+def _to_float(value):
+    """float(value), or 0.0 for missing, non-numeric or NaN values (to_numeric coerce + fillna(0))."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if value != value else value
+
+def _build_topics_frame(analisis_agregado, topicos_principales):
+    """
+    Gráfico 1 topics DataFrame (topico, frecuencia, sentimiento, size).
     
+    Returns None when neither format has topics.
+    """
     # Try to get topics from analisis_agregado first (new format), then topicos_principales (fallback)
-    analisis_agregado = results.get("analisis_agregado", [])
-    topicos_principales = results.get("topicos_principales", [])
-    
     topics_list = []
     
     # Parse analisis_agregado (new Q3 format: array of dicts with topic, frecuencia_relativa, sentimiento_promedio)
@@ -73,74 +57,419 @@ def display_q3_topicos():
                         'sentimiento': data_item.get('sentimiento', 0)
                     })
     
-    if topics_list:
-        df_topics = pd.DataFrame(topics_list)
+    if not topics_list:
+        return None
+    
+    # Coerce numerics in one pure-Python pass (missing/non-numeric -> 0), then build the frame once
+    # with clean float32 columns (half the memory and plot payload of float64)
+    n = len(topics_list)
+    frecuencia = np.fromiter((_to_float(t['frecuencia']) for t in topics_list), dtype=np.float32, count=n)
+    sentimiento = np.fromiter((_to_float(t['sentimiento']) for t in topics_list), dtype=np.float32, count=n)
+    
+    # Scale frecuencia for bubble visibility
+    max_freq = frecuencia.max()
+    if max_freq > 0:
+        size = (frecuencia / max_freq) * 40 + 5  # Scale to 5-45
+    else:
+        size = np.full(n, 15, dtype=np.float32)
+    
+    df_topics = pd.DataFrame({
+        'topico': [t['topico'] for t in topics_list],
+        'frecuencia': frecuencia,
+        'sentimiento': sentimiento,
+        'size': size
+    })
+    
+    return df_topics
+
+def _build_posts_frame(per_post):
+    """
+    Per-post DataFrame shared by Gráfico 2 and Gráfico 3.
+    
+    Returns (df_posts, available_topics, topics_mat, topic_cols, url_to_pos), where
+    available_topics is the sorted union of topic names over all posts,
+    topics_mat is a column-major float32 posts x topics ndarray (missing topics
+    are 0), topic_cols maps each topic to its column and url_to_pos maps each
+    link to its row position, for O(1) selectbox lookups.
+    """
+    df_posts = pd.DataFrame(per_post)
+    
+    # Ensure 'link' column exists
+    if 'link' not in df_posts.columns:
+        df_posts['link'] = [f"Post {i}" for i in range(len(df_posts))]
+    
+    # Truncated link labels, computed once for chart axes, titles and tables
+    # (plain slicing over the string array; skips the .str accessor and StringDtype conversion)
+    links = df_posts['link'].astype(str).to_numpy()
+    df_posts['link_short50'] = [u[:50] for u in links]
+    df_posts['link_short60'] = [u[:60] + "..." for u in links]
+    
+    # One numeric column per topic, so a topic selection is a single column lookup.
+    # Filled straight into a preallocated float32 array (concentrations are low-precision):
+    # no float64 intermediate frame, fillna or astype copies.
+    topic_dicts = [p["topicos"] if isinstance(p.get("topicos"), dict) else {} for p in per_post]
+    topic_cols = {}
+    for d in topic_dicts:
+        for t in d:
+            topic_cols.setdefault(t, len(topic_cols))
+    # Column-major, so the per-topic column read on every selection is contiguous
+    topics_mat = np.zeros((len(topic_dicts), len(topic_cols)), dtype=np.float32, order='F')
+    for i, d in enumerate(topic_dicts):
+        for t, v in d.items():
+            topics_mat[i, topic_cols[t]] = v
+    np.nan_to_num(topics_mat, copy=False)  # None/NaN concentrations count as 0, as fillna(0) did
+    
+    url_to_pos = {}
+    for i, u in enumerate(df_posts['link']):
+        url_to_pos.setdefault(u, i)  # first occurrence wins, as the old mask lookup did
+    
+    # The matrix columns are already the union of topics over all posts
+    return df_posts, sorted(topic_cols), topics_mat, topic_cols, url_to_pos
+
+# Prepared payloads kept in the process-wide cache (one per recently viewed client)
+_PREPARED_MAX_ENTRIES = 16
+
+@st.cache_resource(show_spinner=False, max_entries=_PREPARED_MAX_ENTRIES, ttl=3600)
+def _prepare_q3(results):
+    """
+    Normalize the Q3 results payload once into render-ready structures (cached across reruns).
+    
+    Cached as a resource: reruns get the same objects by reference instead of
+    unpickling a copy of the frames, so callers must treat them as read-only.
+    The cache is process-wide and keyed on each client's payload, so it is
+    bounded (max_entries, ttl) to keep old payloads from piling up.
+    
+    Returns a dict with:
+    - df_topics: Gráfico 1 frame, or None when there are no global topics
+    - df_posts, available_topics, topics_mat, topic_cols, url_to_pos: per-post data for
+      Gráfico 2 and Gráfico 3 (all None when there are no per-post results)
+    - records: the raw per-post dicts, aligned with df_posts rows, so a single
+      post is read without materializing a pandas row Series
+    - top5: pre-rendered Gráfico 2 entries per topic (see _prebuild_top5)
+    - links: list of post links, the Gráfico 3 selectbox options
+    """
+    q3 = {
+        "df_topics": _build_topics_frame(
+            results.get("analisis_agregado", []),
+            results.get("topicos_principales", [])
+        ),
+        "df_posts": None,
+        "available_topics": None,
+        "topics_mat": None,
+        "topic_cols": None,
+        "url_to_pos": None,
+        "records": None,
+        "top5": None,
+        "links": None,
+    }
+    
+    per_post = results.get("analisis_por_publicacion", [])
+    if per_post and isinstance(per_post, list):
+        (q3["df_posts"], q3["available_topics"], q3["topics_mat"],
+         q3["topic_cols"], q3["url_to_pos"]) = _build_posts_frame(per_post)
+        q3["records"] = per_post
+        q3["links"] = q3["df_posts"]["link"].tolist()
+        q3["top5"] = _prebuild_top5(q3["df_posts"], q3["topics_mat"], q3["topic_cols"])
+    
+    return q3
+
+# Static page intro and chart descriptions (module constants, not rebuilt per rerun)
+_INTRO_MD = """
+### ¿Qué es este análisis?
+El **Análisis de Tópicos** identifica los TEMAS principales sobre los que habla tu audiencia. No es sentimiento (positivo/negativo), sino el QUÉ: ¿Hablan de precio? ¿Calidad? ¿Sostenibilidad? ¿Servicio al cliente? Este análisis segmenta toda la conversación en clusters temáticos.
+
+### ¿Por qué es relevante para tu negocio?
+Tu audiencia solo habla de lo que les importa (y a veces, de lo que va mal). Si el 60% de la conversación es sobre "Precio" pero tu estrategia se enfoca en "Innovación", estás hablando en otro idioma. Este análisis te permite:
+- **Alinear inversión:** Dónde va el dinero de marketing debe reflejar dónde está el ruido
+- **Identificar crisis temprano:** Si "Problema de Calidad" crece 40% MoM, es alerta roja
+- **Detectar oportunidades:** Si nadie habla de Sostenibilidad pero es una tendencia emergente, hay espacio
+- **Segmentar estrategia:** Diferentes tópicos requieren diferentes mensajes
+- **Medir influencia de cambios:** Después de un cambio de producto, ¿qué tópicos subieron/bajaron?
+
+### El dato de fondo
+Este análisis usa Topic Modeling (LDA/BERTopic) para identificar clusters de palabras que frecuentemente aparecen juntas. No es buscar keywords, sino descubrir TEMAS emergentes que tu equipo podría no haber anticipado.
+"""
+
+_G1_DESC = """
+**📊 Qué estamos viendo:**
+Un gráfico de burbujas que muestra todos los tópicos identificados en los comentarios de tu audiencia. El tamaño de cada burbuja representa la frecuencia (cuántas veces se menciona ese tópico), y el color representa el sentimiento promedio asociado (rojo=negativo, verde=positivo, amarillo=neutral).
+
+**🔍 Cómo se midió:**
+Se aplicó modelado de tópicos (Topic Modeling) a todos los comentarios para identificar los temas principales. Para cada tópico, se contó su frecuencia de aparición y se calculó el sentimiento promedio de los comentarios que lo mencionan.
+
+**💡 Para qué se usa:**
+Este gráfico te permite:
+- Identificar rápidamente de qué habla tu audiencia (cuáles son los temas candentes).
+- Ver si los tópicos frecuentes tienen sentimiento positivo o negativo.
+- Detectar oportunidades: tópicos con alta frecuencia pero sentimiento negativo necesitan atención.
+- Priorizar temas para futuro contenido basado en interés de la audiencia.
+
+**📌 Tips para interpretarlo:**
+- Burbujas grandes en la derecha (verdes) son "golden topics": populares y bien recibidos.
+- Burbujas grandes en la izquierda (rojas) son "pain points": necesitan solución.
+- Burbujas pequeñas pero verdes son oportunidades emergentes de positividad.
+- Compara el tamaño relativo para priorizar temas.
+"""
+
+_G2_DESC_TMPL = """
+**📊 Qué estamos viendo:**
+Un ranking de las 5 publicaciones que tienen la mayor concentración del tópico "{topic}". Cada barra muestra qué porcentaje de los comentarios de esa publicación están dedicados a este tópico específico.
+
+**🔍 Cómo se midió:**
+Para cada publicación, se identificaron todos los comentarios que mencionan el tópico "{topic}" y se calculó qué porcentaje representan del total de comentarios de esa publicación.
+
+**💡 Para qué se usa:**
+Este ranking te permite:
+- Identificar qué contenido atrae la conversación sobre "{topic}".
+- Replicar patrones de éxito: si quieres más conversación sobre este tópico, analiza qué tienen en común estos 5 posts.
+- Validar si el tema que esperabas tratar en una publicación fue realmente lo que discutió la audiencia.
+- Detectar si un tópico se dispersa mucho o se concentra en pocos posts (concentración = consistencia de mensaje).
+
+**📌 Tips para interpretarlo:**
+- Los posts con barras largas "capturaron" la conversación sobre este tópico.
+- Si el top 5 tiene concentraciones similares, indica que el tópico es "sticky" (pegajoso).
+- Si una publicación tiene concentración muy alta en un tópico, es "especialista" en ese tema.
+- Compara diferentes tópicos para identificar cuáles generan conversación concentrada vs dispersa.
+"""
+
+_G3_DESC = """
+**📊 Qué estamos viendo:**
+Un gráfico de burbujas que muestra todos los tópicos identificados en los comentarios de esta publicación específica. El tamaño y color de cada burbuja indican la concentración (qué porcentaje de los comentarios hablan de ese tópico).
+
+**🔍 Cómo se midió:**
+Se extrajeron todos los comentarios asociados a esta publicación y se aplicó modelado de tópicos para identificar los temas presentes. Se calculó qué porcentaje de los comentarios corresponden a cada tópico.
+
+**💡 Para qué se usa:**
+Este análisis granular por publicación te permite:
+- Validar si los comentarios trataron el tema que esperabas: ¿Publicaste sobre "Precios" pero la audiencia habló de "Envío"?
+- Detectar "ruido temático": ¿La conversación fue dispersa (muchos tópicos pequeños) o concentrada (1-2 tópicos dominantes)?
+- Evaluar la claridad del mensaje: mensajes claros generan conversaciones concentradas en el tópico deseado.
+- Identificar tópicos emergentes no esperados: ¿Surgió una conversación sobre algo que no mencionaste?
+
+**📌 Tips para interpretarlo:**
+- Burbujas grandes = tópicos dominantes en la conversación de este post.
+- Un perfil "desequilibrado" (1-2 burbujas grandes) indica mensaje claro y consistente.
+- Un perfil "equilibrado" (muchas burbujas similares) indica conversación dispersa o ambigüedad en el mensaje.
+- Compara con otros posts de tema similar para ver variaciones en distribución tópica.
+"""
+
+# Shared layout defaults on top of the active default template, validated once at import
+_BUBBLE_TEMPLATE = extend_default_template(showlegend=False, hovermode='closest', height=400)
+_BAR_TEMPLATE = extend_default_template(showlegend=False, height=400)
+
+@st.cache_data(show_spinner=False)
+def _build_global_fig(df_topics):
+    """Gráfico 1 bubble chart, cached on the topics frame (it depends on no widget)."""
+    # Plain dict specs; float32 arrays go to the browser as compact base64 typed arrays
+    sentimiento = df_topics['sentimiento'].to_numpy(dtype=np.float32)
+    return go.Figure(
+        data=[{
+            'type': 'scatter',
+            'x': df_topics['topico'].tolist(),
+            'y': sentimiento,
+            'mode': 'markers',
+            'marker': {
+                'size': df_topics['size'].to_numpy(dtype=np.float32),
+                'color': sentimiento,
+                'colorscale': 'RdYlGn',
+                'showscale': True,
+                'colorbar': {'title': {'text': "Sentimiento"}},
+                'line': {'width': 1, 'color': 'white'}
+            },
+            'text': df_topics['topico'].tolist(),
+            'customdata': df_topics['frecuencia'].to_numpy(dtype=np.float32),
+            'hovertemplate': '<b>%{text}</b><br>Frecuencia: %{customdata:.2f}<br>Sentimiento: %{y:.2f}<extra></extra>'
+        }],
+        layout={
+            'template': _BUBBLE_TEMPLATE,
+            'title': {'text': "Distribución de Tópicos Globales (tamaño=frecuencia, color=sentimiento)"},
+            'xaxis': {'title': {'text': "Tópico"}},
+            'yaxis': {'title': {'text': "Sentimiento Promedio"}},
+            'height': 500,
+            'uirevision': 'q3_g1'  # keep zoom/pan state across reruns
+        }
+    )
+
+def _build_top5_fig(selected_topic, labels, scores):
+    """Gráfico 2 bar chart (pre-rendered for every topic by _prebuild_top5)."""
+    return go.Figure(
+        data=[{
+            'type': 'bar',
+            'y': labels,
+            'x': scores,
+            'orientation': 'h',
+            'marker': {'color': 'mediumpurple'}
+        }],
+        layout={
+            'template': _BAR_TEMPLATE,
+            'title': {'text': f"Top 5 Publicaciones con Mayor Concentración: {selected_topic}"},
+            'xaxis': {'title': {'text': f"Concentración de {selected_topic}"}},
+            'yaxis': {'title': {'text': "Publicación (URL acortada)"}},
+            'uirevision': selected_topic  # reset zoom/pan when the topic changes
+        }
+    )
+
+def _prebuild_top5(df_posts, topics_mat, topic_cols):
+    """
+    Top 5 posts and bar chart for every topic, built once per payload.
+    
+    Returns {topic: (fig, links60, scores)}; fig is None when no post mentions
+    the topic. Topics are few (the orchestrator keeps at most 20 globally), so
+    rendering them all up front is cheap and every selection becomes a lookup.
+    """
+    short50 = df_posts['link_short50'].to_numpy()
+    short60 = df_posts['link_short60'].to_numpy()
+    top5 = {}
+    for topic, col in topic_cols.items():
+        concentration = topics_mat[:, col]
         
-        # Normalize column names
-        if 'nombre' in df_topics.columns and 'topico' not in df_topics.columns:
-            df_topics['topico'] = df_topics['nombre']
-        elif 'topico' not in df_topics.columns:
-            df_topics['topico'] = df_topics.index.astype(str)
+        # Top 5 among non-zero concentrations (ties keep post order)
+        candidates = np.flatnonzero(concentration > 0)
+        if candidates.size == 0:
+            top5[topic] = (None, [], concentration[:0])
+            continue
+        idx = candidates[top_k(concentration[candidates])]
+        scores = concentration[idx]
+        top5[topic] = (_build_top5_fig(topic, short50[idx].tolist(), scores), short60[idx].tolist(), scores)
+    return top5
+
+@st.cache_data(show_spinner=False)
+def _build_post_fig(title_label, topics_names, topics_values):
+    """Gráfico 3 bubble chart, cached per post label and topic values."""
+    return go.Figure(
+        data=[{
+            'type': 'scatter',
+            'x': topics_names,
+            'y': np.ones(len(topics_names), dtype=np.float32),
+            'mode': 'markers',
+            'marker': {
+                'size': np.maximum(topics_values * 5.0, 10.0),  # bubble size, at least 10px
+                'color': topics_values,
+                'colorscale': 'Viridis',
+                'showscale': True,
+                'colorbar': {'title': {'text': "Concentración"}},
+                'line': {'width': 1, 'color': 'white'}
+            },
+            'text': topics_names,
+            'customdata': topics_values,
+            'hovertemplate': '<b>%{text}</b><br>Concentración: %{customdata:.2f}<extra></extra>'
+        }],
+        layout={
+            'template': _BUBBLE_TEMPLATE,
+            'title': {'text': f"Tópicos en: {title_label}"},
+            'xaxis': {'title': {'text': "Tópico"}},
+            'yaxis': {'visible': False},
+            'uirevision': title_label  # reset zoom/pan when the post changes
+        }
+    )
+
+@st.fragment
+def _g2(available_topics, top5):
+    """Gráfico 2: Top 5 posts by the selected topic (reruns on its own)."""
+    selected_topic = st.selectbox(
+        "Selecciona un tópico para ver los Top 5 posts que lo mencionan:",
+        available_topics,
+        key="topic_selector"
+    )
+    
+    # Pre-rendered with the payload: a selection is a dict lookup, no top-k or figure build
+    fig, top_links, top_scores = top5[selected_topic]
+    
+    if fig is None:
+        st.warning(f"No posts encontrados con el tópico: {selected_topic}")
+    else:
+        # Stable key: the frontend keeps the chart element and only diffs the figure
+        st.plotly_chart(fig, use_container_width=True, key="q3_g2_chart")
         
-        # Ensure numeric columns
-        df_topics['frecuencia'] = pd.to_numeric(df_topics['frecuencia'], errors='coerce').fillna(0)
-        df_topics['sentimiento'] = pd.to_numeric(df_topics['sentimiento'], errors='coerce').fillna(0)
+        # Show detailed table
+        st.write("**Detalle de Top 5:**")
+        # Labels and 2-decimal formatting via column_config (no rename/round copies)
+        st.dataframe(
+            {
+                'link_short60': top_links,
+                'topic_concentration': top_scores
+            },
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'link_short60': 'URL del Post',
+                'topic_concentration': st.column_config.NumberColumn(
+                    f'Concentración de "{selected_topic}" (%)', format='%.2f'
+                )
+            }
+        )
+    
+    # Descripción Gráfico 2
+    st.markdown(_G2_DESC_TMPL.format(topic=selected_topic))
+
+@st.fragment
+def _g3(df_posts, links, url_to_pos, records):
+    """Gráfico 3: topic bubbles of the selected post (reruns on its own)."""
+    selected_url = st.selectbox(
+        "Selecciona una publicación para ver su distribución de tópicos:",
+        links,
+        key="post_topic_selector"
+    )
+    selected_pos = url_to_pos[selected_url]
+    
+    # Extract topics for this post (from the raw record, no row-to-Series conversion)
+    topics_dict = records[selected_pos].get("topicos", {})
+    
+    if topics_dict and isinstance(topics_dict, dict) and len(topics_dict) > 0:
+        # Values straight into a float32 array (no intermediate tuples); names stay a
+        # plain list, since st.cache_data hashes object-dtype arrays by pointer
+        topics_names = list(topics_dict)
+        topics_values = np.fromiter(topics_dict.values(), dtype=np.float32, count=len(topics_names))
         
-        # Scale frecuencia for bubble visibility
-        max_freq = df_topics['frecuencia'].max()
-        if max_freq > 0:
-            df_topics['size'] = (df_topics['frecuencia'] / max_freq) * 40 + 5  # Scale to 5-45
-        else:
-            df_topics['size'] = 15
+        # Create bubble chart for post-specific topics
+        fig = _build_post_fig(df_posts['link_short60'].iat[selected_pos], topics_names, topics_values)
+        st.plotly_chart(fig, use_container_width=True, key="q3_g3_chart")
         
-        # Create bubble chart
-        fig = go.Figure(data=[go.Scatter(
-            x=df_topics['topico'],
-            y=df_topics['sentimiento'],
-            mode='markers',
-            marker=dict(
-                size=df_topics['size'],
-                color=df_topics['sentimiento'],
-                colorscale='RdYlGn',
-                showscale=True,
-                colorbar=dict(title="Sentimiento"),
-                line=dict(width=1, color='white')
-            ),
-            text=df_topics['topico'],
-            customdata=df_topics['frecuencia'],
-            hovertemplate='<b>%{text}</b><br>Frecuencia: %{customdata:.2f}<br>Sentimiento: %{y:.2f}<extra></extra>'
-        )])
-        fig.update_layout(
-            title="Distribución de Tópicos Globales (tamaño=frecuencia, color=sentimiento)",
-            xaxis_title="Tópico",
-            yaxis_title="Sentimiento Promedio",
-            height=500,
-            showlegend=False,
-            hovermode='closest'
+        # Show summary
+        st.write("**Resumen de Tópicos:**")
+        # Tiny table: sorted with argsort and passed as a dict (no DataFrame + sort_values)
+        order = np.argsort(-topics_values, kind='stable')
+        st.dataframe(
+            {
+                'Tópico': [topics_names[i] for i in order],
+                'Concentración (%)': topics_values[order]
+            },
+            use_container_width=True
         )
-        st.plotly_chart(fig, use_container_width=True)
         
-        # Descripción Gráfico 1
-        st.markdown("""
-        **📊 Qué estamos viendo:**
-        Un gráfico de burbujas que muestra todos los tópicos identificados en los comentarios de tu audiencia. El tamaño de cada burbuja representa la frecuencia (cuántas veces se menciona ese tópico), y el color representa el sentimiento promedio asociado (rojo=negativo, verde=positivo, amarillo=neutral).
-
-        **🔍 Cómo se midió:**
-        Se aplicó modelado de tópicos (Topic Modeling) a todos los comentarios para identificar los temas principales. Para cada tópico, se contó su frecuencia de aparición y se calculó el sentimiento promedio de los comentarios que lo mencionan.
-
-        **💡 Para qué se usa:**
-        Este gráfico te permite:
-        - Identificar rápidamente de qué habla tu audiencia (cuáles son los temas candentes).
-        - Ver si los tópicos frecuentes tienen sentimiento positivo o negativo.
-        - Detectar oportunidades: tópicos con alta frecuencia pero sentimiento negativo necesitan atención.
-        - Priorizar temas para futuro contenido basado en interés de la audiencia.
+        # Descripción Gráfico 3
+        st.markdown(_G3_DESC)
+    else:
+        st.info("No topics available for this publication")
 
-        **📌 Tips para interpretarlo:**
-        - Burbujas grandes en la derecha (verdes) son "golden topics": populares y bien recibidos.
-        - Burbujas grandes en la izquierda (rojas) son "pain points": necesitan solución.
-        - Burbujas pequeñas pero verdes son oportunidades emergentes de positividad.
-        - Compara el tamaño relativo para priorizar temas.
-        """)
+def display_q3_topicos():
+    st.title("💬 Q3: Análisis de Tópicos Principales")
+    
+    # Long intro collapsed by default, like the methodology expanders on the main page
+    with st.expander("ℹ️ Sobre este análisis", expanded=False):
+        st.markdown(_INTRO_MD)
+    
+    data = load_q3_data()
+    if data is None:
+        return
+    
+    # Payload normalized once (cached); everything below only renders
+    q3 = _prepare_q3(data.get("results", {}))
+    
+    # ============================================================================
+    # GRÁFICO 1: TÓPICOS GLOBALES (BURBUJAS)
+    # ============================================================================
+    st.header("📊 Gráfico 1: Tópicos Globales")
+    
+    df_topics = q3["df_topics"]
+    
+    if df_topics is not None:
+        fig = _build_global_fig(df_topics)
+        # Static chart: no mode bar, so no toolbar handlers are set up client-side
+        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False}, key="q3_g1_chart")
+        
+        # Descripción Gráfico 1
+        st.markdown(_G1_DESC)
     else:
         st.info("No topics data available for global analysis")
     
@@ -149,98 +478,11 @@ def display_q3_topicos():
     # ============================================================================
     st.header("📊 Gráfico 2: Top 5 Publicaciones por Tópico")
     
-    per_post = results.get("analisis_por_publicacion", [])
+    df_posts = q3["df_posts"]
     
-    if per_post and isinstance(per_post, list) and len(per_post) > 0:
-        df_posts = pd.DataFrame(per_post)
-        
-        # Extract all available topics from all posts (more robust)
-        available_topics = set()
-        for post in per_post:
-            if isinstance(post, dict):
-                topicos = post.get("topicos", {})
-                if isinstance(topicos, dict):
-                    available_topics.update(topicos.keys())
-        
-        available_topics = sorted(list(available_topics))
-        
-        if available_topics:
-            selected_topic = st.selectbox(
-                "Selecciona un tópico para ver los Top 5 posts que lo mencionan:",
-                available_topics,
-                key="topic_selector"
-            )
-            
-            # Extract topic concentration for all posts
-            df_posts['topic_concentration'] = df_posts.apply(
-                lambda row: (row.get('topicos', {}).get(selected_topic, 0) 
-                            if isinstance(row.get('topicos'), dict) 
-                            else 0),
-                axis=1
-            )
-            
-            # Get top 5 (filter by non-zero concentration)
-            top_5_posts = df_posts[df_posts['topic_concentration'] > 0].nlargest(5, 'topic_concentration')
-            
-            if len(top_5_posts) == 0:
-                st.warning(f"No posts encontrados con el tópico: {selected_topic}")
-            else:
-                cols_to_select = ['link', 'topic_concentration']
-                if 'sentimiento' in df_posts.columns:
-                    cols_to_select.append('sentimiento')
-                
-                display_data = top_5_posts[cols_to_select].copy()
-                
-                # Create horizontal bar chart
-                fig = go.Figure([go.Bar(
-                    y=display_data['link'].str[:50],
-                    x=display_data['topic_concentration'],
-                    orientation='h',
-                    marker_color='mediumpurple'
-                )])
-                fig.update_layout(
-                    title=f"Top 5 Publicaciones con Mayor Concentración: {selected_topic}",
-                    xaxis_title=f"Concentración de {selected_topic}",
-                    yaxis_title="Publicación (URL acortada)",
-                    height=400,
-                    showlegend=False
-                )
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Show detailed table
-                st.write("**Detalle de Top 5:**")
-                display_df = top_5_posts[['link', 'topic_concentration']].copy()
-                display_df['link'] = display_df['link'].str[:60] + "..."
-                display_df['topic_concentration'] = display_df['topic_concentration'].round(2)
-                
-                display_df = display_df.rename(columns={
-                    'link': 'URL del Post',
-                    'topic_concentration': f'Concentración de "{selected_topic}" (%)'
-                })
-                
-                st.dataframe(display_df, use_container_width=True, hide_index=True)
-            
-            # Descripción Gráfico 2
-            st.markdown(f"""
-            **📊 Qué estamos viendo:**
-            Un ranking de las 5 publicaciones que tienen la mayor concentración del tópico "{selected_topic}". Cada barra muestra qué porcentaje de los comentarios de esa publicación están dedicados a este tópico específico.
-
-            **🔍 Cómo se midió:**
-            Para cada publicación, se identificaron todos los comentarios que mencionan el tópico "{selected_topic}" y se calculó qué porcentaje representan del total de comentarios de esa publicación.
-
-            **💡 Para qué se usa:**
-            Este ranking te permite:
-            - Identificar qué contenido atrae la conversación sobre "{selected_topic}".
-            - Replicar patrones de éxito: si quieres más conversación sobre este tópico, analiza qué tienen en común estos 5 posts.
-            - Validar si el tema que esperabas tratar en una publicación fue realmente lo que discutió la audiencia.
-            - Detectar si un tópico se dispersa mucho o se concentra en pocos posts (concentración = consistencia de mensaje).
-
-            **📌 Tips para interpretarlo:**
-            - Los posts con barras largas "capturaron" la conversación sobre este tópico.
-            - Si el top 5 tiene concentraciones similares, indica que el tópico es "sticky" (pegajoso).
-            - Si una publicación tiene concentración muy alta en un tópico, es "especialista" en ese tema.
-            - Compara diferentes tópicos para identificar cuáles generan conversación concentrada vs dispersa.
-            """)
+    if df_posts is not None:
+        if q3["available_topics"]:
+            _g2(q3["available_topics"], q3["top5"])
         else:
             st.info("No topic data available per post")
     else:
@@ -251,85 +493,7 @@ def display_q3_topicos():
     # ============================================================================
     st.header("📊 Gráfico 3: Tópicos de Una Publicación Específica")
     
-    if per_post and isinstance(per_post, list) and len(per_post) > 0:
-        df_posts = pd.DataFrame(per_post)
-        
-        # Ensure 'link' column exists
-        if 'link' not in df_posts.columns:
-            df_posts['link'] = [f"Post {i}" for i in range(len(df_posts))]
-        
-        selected_url = st.selectbox(
-            "Selecciona una publicación para ver su distribución de tópicos:",
-            df_posts["link"].tolist(),
-            key="post_topic_selector"
-        )
-        selected_post = df_posts[df_posts["link"] == selected_url].iloc[0]
-        
-        # Extract topics for this post
-        topics_dict = selected_post.get("topicos", {})
-        
-        if topics_dict and isinstance(topics_dict, dict) and len(topics_dict) > 0:
-            # Prepare data
-            topics_names = list(topics_dict.keys())
-            topics_values = [topics_dict[t] for t in topics_names]
-            
-            # Create bubble chart for post-specific topics
-            fig = go.Figure(data=[go.Scatter(
-                x=topics_names,
-                y=[1] * len(topics_names),
-                mode='markers',
-                marker=dict(
-                    size=[max(v * 5, 10) for v in topics_values],
-                    color=topics_values,
-                    colorscale='Viridis',
-                    showscale=True,
-                    colorbar=dict(title="Concentración"),
-                    line=dict(width=1, color='white')
-                ),
-                text=topics_names,
-                customdata=topics_values,
-                hovertemplate='<b>%{text}</b><br>Concentración: %{customdata:.2f}<extra></extra>'
-            )])
-            fig.update_layout(
-                title=f"Tópicos en: {selected_url[:60]}...",
-                xaxis_title="Tópico",
-                yaxis_visible=False,
-                height=400,
-                showlegend=False,
-                hovermode='closest'
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Show summary
-            st.write("**Resumen de Tópicos:**")
-            summary_df = pd.DataFrame({
-                'Tópico': topics_names,
-                'Concentración (%)': topics_values
-            }).sort_values('Concentración (%)', ascending=False)
-            st.dataframe(summary_df, use_container_width=True)
-            
-            # Descripción Gráfico 3
-            st.markdown(f"""
-            **📊 Qué estamos viendo:**
-            Un gráfico de burbujas que muestra todos los tópicos identificados en los comentarios de esta publicación específica. El tamaño y color de cada burbuja indican la concentración (qué porcentaje de los comentarios hablan de ese tópico).
-
-            **🔍 Cómo se midió:**
-            Se extrajeron todos los comentarios asociados a esta publicación y se aplicó modelado de tópicos para identificar los temas presentes. Se calculó qué porcentaje de los comentarios corresponden a cada tópico.
-
-            **💡 Para qué se usa:**
-            Este análisis granular por publicación te permite:
-            - Validar si los comentarios trataron el tema que esperabas: ¿Publicaste sobre "Precios" pero la audiencia habló de "Envío"?
-            - Detectar "ruido temático": ¿La conversación fue dispersa (muchos tópicos pequeños) o concentrada (1-2 tópicos dominantes)?
-            - Evaluar la claridad del mensaje: mensajes claros generan conversaciones concentradas en el tópico deseado.
-            - Identificar tópicos emergentes no esperados: ¿Surgió una conversación sobre algo que no mencionaste?
-
-            **📌 Tips para interpretarlo:**
-            - Burbujas grandes = tópicos dominantes en la conversación de este post.
-            - Un perfil "desequilibrado" (1-2 burbujas grandes) indica mensaje claro y consistente.
-            - Un perfil "equilibrado" (muchas burbujas similares) indica conversación dispersa o ambigüedad en el mensaje.
-            - Compara con otros posts de tema similar para ver variaciones en distribución tópica.
-            """)
-        else:
-            st.info("No topics available for this publication")
+    if df_posts is not None:
+        _g3(df_posts, q3["links"], q3["url_to_pos"], q3["records"])
     else:
         st.info("No per-publication data available")
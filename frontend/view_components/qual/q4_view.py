@@ -1,9 +1,12 @@
 """Q4 View: Narrative Framing Analysis - 4 Gráficos Según Especificación"""
+from functools import lru_cache
 import streamlit as st # type: ignore
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go  # type: ignore
 from view_components.data_loader import load_q4_data as api_load_q4
 from view_components.compat_loader import load_from_api_or_file
+from view_components.ranking import top_k
 
 def load_q4_data():
     """Load Q4 data from API or local file (backward compatibility)."""
@@ -18,8 +21,9 @@ MARCO_COLORS = {
     'Negativa': '#e74c3c',
 }
 
+@lru_cache(maxsize=128)
 def get_marco_color(marco):
-    """Retorna color CSS para un marco dado."""
+    """Retorna color CSS para un marco dado (memoizado: cada marco se resuelve una vez)."""
     if marco in MARCO_COLORS:
         return MARCO_COLORS[marco]
     # Mapeo automático por palabra clave
@@ -33,6 +37,291 @@ def get_marco_color(marco):
     else:
         return '#95a5a6'
 
+# Columns that may hold a post's marco distribution, in detection order
+_MARCOS_COLUMNS = ('marcos_narrativos', 'distribucion_marcos', 'marcos', 'narrativos', 'framing')
+
+def _detect_marcos_column(per_post):
+    """
+    Detect once which column holds the marco distributions.
+    
+    Returns (column, marco names) for the first of _MARCOS_COLUMNS whose first
+    non-null value is a dict, or (None, []) when no post has one.
+    """
+    for col in _MARCOS_COLUMNS:
+        first_dist = next((post[col] for post in per_post if post.get(col) is not None), None)
+        if isinstance(first_dist, dict) and first_dist:
+            return col, list(first_dist.keys())
+    return None, []
+
+@st.cache_data(show_spinner=False)
+def _build_posts_data(per_post):
+    """
+    Per-post data shared by Gráfico 2 and Gráfico 3 (cached across reruns).
+    
+    Only the fields the charts rank on are projected into a DataFrame; the
+    heavy per-post fields (ejemplos_narrativos, ...) stay in per_post and are
+    read through url_to_pos. Returns a dict with:
+    - df_posts: one row per post with 'link' and its truncated chart/table
+      labels 'link_short50' / 'link_short60'
+    - available_marcos: marco names of the detected distribution column
+    - top5_by_marco: marco -> (chart labels, concentrations, detail table) of
+      its Top 5 posts
+    - url_to_pos: link -> position in per_post, for O(1) selectbox lookups
+    """
+    marcos_col, available_marcos = _detect_marcos_column(per_post)
+    # Columns read for each post's distribution, first dict wins
+    dist_cols = ['marcos_narrativos', 'distribucion_marcos']
+    if marcos_col is not None and marcos_col not in dist_cols:
+        dist_cols.append(marcos_col)
+    
+    # Dense posts x marcos matrix, filled in one pass over the posts, so each
+    # marco's concentrations are a column slice (0 where a post lacks the marco)
+    marco_idx = {marco: j for j, marco in enumerate(available_marcos)}
+    marcos_mat = np.zeros((len(per_post), len(available_marcos)))
+    links = []
+    url_to_pos = {}
+    for pos, post in enumerate(per_post):
+        link = post.get('link', '')
+        dist = next((post[col] for col in dist_cols if isinstance(post.get(col), dict)), None)
+        if dist is not None:
+            for marco, value in dist.items():
+                j = marco_idx.get(marco)
+                if j is not None:
+                    marcos_mat[pos, j] = np.nan if value is None else value
+        links.append(link)
+        url_to_pos.setdefault(link, pos)  # first post wins, like a boolean-mask .iloc[0]
+    df_posts = pd.DataFrame({
+        'link': links,
+        'link_short50': [u[:50] for u in links],
+        'link_short60': [u[:60] + "..." for u in links]
+    })
+    
+    # Top 5 posts of every marco with its ready-made detail table, so a marco
+    # change in Gráfico 2 is a dict lookup
+    top5_by_marco = {}
+    for marco, j in marco_idx.items():
+        idx = top_k(marcos_mat[:, j])
+        values = marcos_mat[idx, j]
+        display_df = pd.DataFrame({
+            'URL': df_posts['link_short60'].to_numpy()[idx],
+            f'{marco} (%)': values
+        }, index=idx)
+        top5_by_marco[marco] = (df_posts['link_short50'].to_numpy()[idx].tolist(), values.tolist(), display_df)
+    
+    return {
+        "df_posts": df_posts,
+        "available_marcos": available_marcos,
+        "top5_by_marco": top5_by_marco,
+        "url_to_pos": url_to_pos,
+    }
+
+@st.cache_data(show_spinner=False)
+def _build_global_fig(marcos_list, marcos_valores):
+    """Gráfico 1 figure, cached on the marco names and values."""
+    colors = [get_marco_color(m) for m in marcos_list]
+    fig = go.Figure([go.Bar(
+        x=marcos_list,
+        y=marcos_valores,
+        marker_color=colors
+    )])
+    fig.update_layout(
+        title="Distribución Global de Marcos Narrativos",
+        xaxis_title="Marco Narrativo",
+        yaxis_title="Distribución (%)",
+        showlegend=False,
+        height=400,
+        uirevision='q4_g1'  # keep zoom/pan state across reruns
+    )
+    return fig
+
+@st.cache_data(show_spinner=False)
+def _build_top5_fig(selected_marco, labels, values):
+    """Gráfico 2 figure, cached per marco and plotted values."""
+    marco_color = get_marco_color(selected_marco)
+    fig = go.Figure([go.Bar(
+        y=labels,
+        x=values,
+        orientation='h',
+        marker_color=marco_color
+    )])
+    fig.update_layout(
+        title=f"Top 5 Publicaciones con Mayor Concentración: {selected_marco}",
+        xaxis_title=f"Concentración de {selected_marco} (%)",
+        yaxis_title="Publicación (URL acortada)",
+        height=400,
+        showlegend=False,
+        uirevision=selected_marco  # reset zoom/pan when the marco changes
+    )
+    return fig
+
+@st.cache_data(show_spinner=False)
+def _build_post_fig(title_label, marcos_names, marcos_values):
+    """Gráfico 3 figure, cached per post and its marco distribution."""
+    colors = [get_marco_color(m) for m in marcos_names]
+    fig = go.Figure([go.Bar(
+        x=marcos_names,
+        y=marcos_values,
+        marker_color=colors
+    )])
+    fig.update_layout(
+        title=f"Distribución de Marcos: {title_label}",
+        xaxis_title="Marco Narrativo",
+        yaxis_title="Distribución (%)",
+        showlegend=False,
+        height=400,
+        uirevision=title_label  # reset zoom/pan when the post changes
+    )
+    return fig
+
+@st.cache_data(show_spinner=False)
+def _build_temporal_data(temporal_data):
+    """
+    Period labels and per-marco series for Gráfico 4; the series come from one
+    json_normalize pass.
+    
+    Returns (periods, marcos_data) with marcos_data as marco -> list of values
+    aligned with periods (NaN where a period lacks that marco).
+    """
+    items = [item for item in temporal_data if isinstance(item, dict)]
+    df_t = pd.json_normalize(items)
+    
+    # Period label per item: semana, else periodo, else fecha; coalesced row by
+    # row so a missing semana neither drops the label nor turns weeks into floats
+    periods = []
+    for item in items:
+        period = item.get("semana") or item.get("periodo") or item.get("fecha")
+        periods.append(f"Semana {period}" if isinstance(period, int) else str(period))
+    
+    prefix = "marcos_distribucion."
+    marcos_data = {
+        col[len(prefix):]: df_t[col].tolist()
+        for col in df_t.columns if col.startswith(prefix)
+    }
+    return periods, marcos_data
+
+@st.cache_data(show_spinner=False)
+def _build_temporal_fig(periods, marcos_data):
+    """Gráfico 4 figure, cached on the period labels and per-marco series."""
+    fig = go.Figure()
+    for marco, values in marcos_data.items():
+        fig.add_trace(go.Scatter(
+            x=periods,
+            y=values,
+            mode='lines+markers',
+            name=marco,
+            line=dict(color=get_marco_color(marco), width=2)
+        ))
+    
+    fig.update_layout(
+        title="Evolución Temporal de Marcos Narrativos",
+        xaxis_title="Tiempo",
+        yaxis_title="Concentración (%)",
+        hovermode='x unified',
+        height=450,
+        uirevision='q4_g4'
+    )
+    return fig
+
+@st.fragment
+def _g2(available_marcos, top5_by_marco):
+    """Gráfico 2: Top 5 posts by the selected marco (reruns on its own)."""
+    selected_marco = st.selectbox(
+        "Selecciona un marco narrativo para ver los Top 5 posts que lo generaron:",
+        available_marcos,
+        key="marco_selector"
+    )
+    
+    # Get top 5 (precomputed per marco)
+    top_labels, top_values, display_df = top5_by_marco[selected_marco]
+    
+    # Create horizontal bar chart with marco color
+    fig = _build_top5_fig(selected_marco, top_labels, top_values)
+    st.plotly_chart(fig, use_container_width=True, key="q4_g2_chart")
+    
+    # Show detailed table (built once with the Top 5)
+    st.write("**Detalle de Top 5:**")
+    st.dataframe(display_df, use_container_width=True)
+    
+    st.markdown(f"""
+    **📊 Qué estamos viendo:**
+    Un ranking de las 5 publicaciones que generaron la mayor proporción del marco narrativo "{selected_marco}". Esto te muestra qué contenido específico "activó" este tipo de narrativa en tu audiencia.
+
+    **🔍 Cómo se midió:**
+    Para cada publicación, se analizó todos sus comentarios y se calculó qué porcentaje corresponden al marco "{selected_marco}".
+
+    **💡 Para qué se usa:**
+    - Si buscas narrativa Positiva: replica los elementos de estos top 5 posts.
+    - Si buscas reducir narrativa Negativa: analiza qué tienen en común para evitarlo.
+    - Si buscas estimular Aspiracional: usa estos posts como modelo para futuro contenido.
+
+    **📌 Tips para interpretarlo:**
+    - Los posts con concentración alta son "activadores" de ese marco.
+    - Si un marco está disperso (sin posts con alta concentración), es un patrón consistente general.
+    - Si está concentrado en pocos posts, esos posts específicos causaron esa narrativa.
+    """)
+
+@st.fragment
+def _g3(df_posts, url_to_pos, per_post):
+    """Gráfico 3: marco profile and examples of the selected post (reruns on its own)."""
+    selected_url = st.selectbox(
+        "Selecciona una publicación para ver su perfil narrativo y ejemplos:",
+        df_posts["link"].tolist(),
+        key="post_marco_selector"
+    )
+    selected_pos = url_to_pos[selected_url]
+    selected_post = per_post[selected_pos]
+    
+    # Extract marcos distribution - try both column names
+    marcos_dist = selected_post.get("marcos_narrativos", {})
+    if not marcos_dist or not isinstance(marcos_dist, dict):
+        marcos_dist = selected_post.get("distribucion_marcos", {})
+    if not marcos_dist or not isinstance(marcos_dist, dict):
+        marcos_dist = selected_post.get('marcos', {})
+    
+    if marcos_dist and isinstance(marcos_dist, dict):
+        marcos_names = list(marcos_dist.keys())
+        marcos_values = list(marcos_dist.values())
+        
+        # Create bar chart
+        fig = _build_post_fig(df_posts['link_short60'].iat[selected_pos], marcos_names, marcos_values)
+        st.plotly_chart(fig, use_container_width=True, key="q4_g3_chart")
+        
+        st.markdown(f"""
+        **📊 Qué estamos viendo:**
+        La distribución de los tres marcos narrativos en los comentarios de esta publicación específica. Muestra qué tipo de narrativas generó tu contenido.
+
+        **🔍 Cómo se midió:**
+        Se extrajeron todos los comentarios de esta publicación y se clasificaron según su marco narrativo.
+
+        **💡 Para qué se usa:**
+        - Validar si generaste la narrativa que esperabas.
+        - Ajustar el tono de futuras publicaciones basándote en lo que generaste.
+
+        **📌 Tips para interpretarlo:**
+        - Un marco dominante (>60%) indica mensaje claro.
+        - Un perfil equilibrado indica audiencia reflexiva o contenido ambiguo.
+        """)
+        
+        # Show representative examples (if available)
+        st.markdown("---")
+        st.markdown("#### 💬 Ejemplos Narrativos (Evidencia Textual)")
+        
+        # Each example is sent only once its toggle is switched on (a collapsed
+        # expander would still ship its text); toggling reruns just this fragment
+        ejemplos = selected_post.get("ejemplos_narrativos", {})
+        if ejemplos and isinstance(ejemplos, dict):
+            for marco, ejemplo_text in ejemplos.items():
+                if ejemplo_text and st.toggle(f"Ejemplo {marco}", key=f"q4_ex_{marco}"):
+                    st.write(f"**{ejemplo_text}**")
+        elif ejemplos and isinstance(ejemplos, list):
+            for i, ejemplo_text in enumerate(ejemplos, 1):
+                if ejemplo_text and st.toggle(f"Ejemplo {i}", key=f"q4_ex_{i}"):
+                    st.write(f"**{ejemplo_text}**")
+        else:
+            st.info("No narrative examples available for this publication")
+    else:
+        st.info("No marco distribution available for this publication")
+
 def display_q4_marcos_narrativos():
     st.title("📜 Q4: Análisis de Marcos Narrativos (Entman)")
     
@@ -62,6 +351,10 @@ def display_q4_marcos_narrativos():
     
     results = data.get("results", {})
     
+    # Per-post data shared by Gráfico 2 and Gráfico 3, built once per page run
+    per_post = results.get("analisis_por_publicacion", [])
+    posts = _build_posts_data(per_post) if per_post else None
+    
     # ============================================================================
     # GRÁFICO 1: DISTRIBUCIÓN GLOBAL DE MARCOS NARRATIVOS
     # ============================================================================
@@ -82,21 +375,9 @@ def display_q4_marcos_narrativos():
         
         if marcos_list:
             # Create stacked bar or pie chart
-            colors = [get_marco_color(m) for m in marcos_list]
-            
-            fig = go.Figure([go.Bar(
-                x=marcos_list,
-                y=marcos_valores,
-                marker_color=colors
-            )])
-            fig.update_layout(
-                title="Distribución Global de Marcos Narrativos",
-                xaxis_title="Marco Narrativo",
-                yaxis_title="Distribución (%)",
-                showlegend=False,
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            fig = _build_global_fig(marcos_list, marcos_valores)
+            # Static chart: no mode bar, so no toolbar handlers are set up client-side
+            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False}, key="q4_g1_chart")
             
             st.markdown("""
             **📊 Qué estamos viendo:**
@@ -125,93 +406,9 @@ def display_q4_marcos_narrativos():
     # ============================================================================
     st.header("📊 Gráfico 2: Top 5 Publicaciones por Marco Narrativo")
     
-    per_post = results.get("analisis_por_publicacion", [])
-    
-    if per_post:
-        df_posts = pd.DataFrame(per_post)
-        
-        # Extract available marcos from first post - try multiple column names
-        first_post_dist = {}
-        if 'marcos_narrativos' in df_posts.columns:
-            first_post_dist = df_posts.iloc[0].get("marcos_narrativos", {}) if isinstance(df_posts.iloc[0].get("marcos_narrativos"), dict) else {}
-        elif 'distribucion_marcos' in df_posts.columns:
-            first_post_dist = df_posts.iloc[0].get("distribucion_marcos", {}) if isinstance(df_posts.iloc[0].get("distribucion_marcos"), dict) else {}
-        
-        available_marcos = list(first_post_dist.keys()) if first_post_dist else []
-        
-        if not available_marcos:
-            # Try alternative structures
-            for col in ['marcos', 'narrativos', 'framing']:
-                if col in df_posts.columns:
-                    first_val = df_posts.iloc[0][col]
-                    if isinstance(first_val, dict):
-                        available_marcos = list(first_val.keys())
-                        break
-        
-        if available_marcos:
-            selected_marco = st.selectbox(
-                "Selecciona un marco narrativo para ver los Top 5 posts que lo generaron:",
-                available_marcos,
-                key="marco_selector"
-            )
-            
-            # Extract marco concentration for all posts - handle both column names
-            def get_marco_value(row):
-                if isinstance(row.get('marcos_narrativos'), dict):
-                    return row.get('marcos_narrativos', {}).get(selected_marco, 0)
-                elif isinstance(row.get('distribucion_marcos'), dict):
-                    return row.get('distribucion_marcos', {}).get(selected_marco, 0)
-                return 0
-            
-            df_posts['marco_concentration'] = df_posts.apply(get_marco_value, axis=1)
-            
-            # Get top 5
-            top_5_posts = df_posts.nlargest(5, 'marco_concentration')[['link', 'marco_concentration']]
-            
-            # Create horizontal bar chart with marco color
-            marco_color = get_marco_color(selected_marco)
-            fig = go.Figure([go.Bar(
-                y=top_5_posts['link'].str[:50],
-                x=top_5_posts['marco_concentration'],
-                orientation='h',
-                marker_color=marco_color
-            )])
-            fig.update_layout(
-                title=f"Top 5 Publicaciones con Mayor Concentración: {selected_marco}",
-                xaxis_title=f"Concentración de {selected_marco} (%)",
-                yaxis_title="Publicación (URL acortada)",
-                height=400,
-                showlegend=False
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Show detailed table
-            st.write("**Detalle de Top 5:**")
-            display_df = top_5_posts.copy()
-            display_df['link'] = display_df['link'].str[:60] + "..."
-            display_df = display_df.rename(columns={
-                'link': 'URL',
-                'marco_concentration': f'{selected_marco} (%)'
-            })
-            st.dataframe(display_df, use_container_width=True)
-            
-            st.markdown(f"""
-            **📊 Qué estamos viendo:**
-            Un ranking de las 5 publicaciones que generaron la mayor proporción del marco narrativo "{selected_marco}". Esto te muestra qué contenido específico "activó" este tipo de narrativa en tu audiencia.
-
-            **🔍 Cómo se midió:**
-            Para cada publicación, se analizó todos sus comentarios y se calculó qué porcentaje corresponden al marco "{selected_marco}".
-
-            **💡 Para qué se usa:**
-            - Si buscas narrativa Positiva: replica los elementos de estos top 5 posts.
-            - Si buscas reducir narrativa Negativa: analiza qué tienen en común para evitarlo.
-            - Si buscas estimular Aspiracional: usa estos posts como modelo para futuro contenido.
-
-            **📌 Tips para interpretarlo:**
-            - Los posts con concentración alta son "activadores" de ese marco.
-            - Si un marco está disperso (sin posts con alta concentración), es un patrón consistente general.
-            - Si está concentrado en pocos posts, esos posts específicos causaron esa narrativa.
-            """)
+    if posts is not None:
+        if posts["available_marcos"]:
+            _g2(posts["available_marcos"], posts["top5_by_marco"])
         else:
             st.info("No marco distribution data available per post")
     else:
@@ -222,77 +419,8 @@ def display_q4_marcos_narrativos():
     # ============================================================================
     st.header("📊 Gráfico 3: Análisis Narrativo por Publicación (con Evidencia)")
     
-    if per_post:
-        df_posts = pd.DataFrame(per_post)
-        selected_url = st.selectbox(
-            "Selecciona una publicación para ver su perfil narrativo y ejemplos:",
-            df_posts["link"].tolist(),
-            key="post_marco_selector"
-        )
-        selected_post = df_posts[df_posts["link"] == selected_url].iloc[0]
-        
-        # Extract marcos distribution - try both column names
-        marcos_dist = selected_post.get("marcos_narrativos", {})
-        if not marcos_dist or not isinstance(marcos_dist, dict):
-            marcos_dist = selected_post.get("distribucion_marcos", {})
-        if not marcos_dist or not isinstance(marcos_dist, dict):
-            marcos_dist = selected_post.get('marcos', {})
-        
-        if marcos_dist and isinstance(marcos_dist, dict):
-            marcos_names = list(marcos_dist.keys())
-            marcos_values = list(marcos_dist.values())
-            colors = [get_marco_color(m) for m in marcos_names]
-            
-            # Create bar chart
-            fig = go.Figure([go.Bar(
-                x=marcos_names,
-                y=marcos_values,
-                marker_color=colors
-            )])
-            fig.update_layout(
-                title=f"Distribución de Marcos: {selected_url[:60]}...",
-                xaxis_title="Marco Narrativo",
-                yaxis_title="Distribución (%)",
-                showlegend=False,
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-            st.markdown(f"""
-            **📊 Qué estamos viendo:**
-            La distribución de los tres marcos narrativos en los comentarios de esta publicación específica. Muestra qué tipo de narrativas generó tu contenido.
-
-            **🔍 Cómo se midió:**
-            Se extrajeron todos los comentarios de esta publicación y se clasificaron según su marco narrativo.
-
-            **💡 Para qué se usa:**
-            - Validar si generaste la narrativa que esperabas.
-            - Ajustar el tono de futuras publicaciones basándote en lo que generaste.
-
-            **📌 Tips para interpretarlo:**
-            - Un marco dominante (>60%) indica mensaje claro.
-            - Un perfil equilibrado indica audiencia reflexiva o contenido ambiguo.
-            """)
-            
-            # Show representative examples (if available)
-            st.markdown("---")
-            st.markdown("#### 💬 Ejemplos Narrativos (Evidencia Textual)")
-            
-            ejemplos = selected_post.get("ejemplos_narrativos", {})
-            if ejemplos and isinstance(ejemplos, dict):
-                for marco, ejemplo_text in ejemplos.items():
-                    if ejemplo_text:
-                        with st.expander(f"Ejemplo {marco}"):
-                            st.write(f"**{ejemplo_text}**")
-            elif ejemplos and isinstance(ejemplos, list):
-                for i, ejemplo_text in enumerate(ejemplos, 1):
-                    if ejemplo_text:
-                        with st.expander(f"Ejemplo {i}"):
-                            st.write(f"**{ejemplo_text}**")
-            else:
-                st.info("No narrative examples available for this publication")
-        else:
-            st.info("No marco distribution available for this publication")
+    if posts is not None:
+        _g3(posts["df_posts"], posts["url_to_pos"], per_post)
     else:
         st.info("No per-publication data available")
     
@@ -307,41 +435,11 @@ def display_q4_marcos_narrativos():
         # Try to create temporal visualization
         try:
             # Extract marcos data from each period
-            periods = []
-            marcos_data = {}
-            
-            for item in temporal_data:
-                if isinstance(item, dict):
-                    period = item.get("semana") or item.get("periodo") or item.get("fecha")
-                    period_str = f"Semana {period}" if isinstance(period, int) else str(period)
-                    periods.append(period_str)
-                    
-                    marcos_dist = item.get("marcos_distribucion", {})
-                    if isinstance(marcos_dist, dict):
-                        for marco, value in marcos_dist.items():
-                            if marco not in marcos_data:
-                                marcos_data[marco] = []
-                            marcos_data[marco].append(value)
+            periods, marcos_data = _build_temporal_data(temporal_data)
             
             if periods and marcos_data:
-                fig = go.Figure()
-                for marco, values in marcos_data.items():
-                    fig.add_trace(go.Scatter(
-                        x=periods,
-                        y=values,
-                        mode='lines+markers',
-                        name=marco,
-                        line=dict(color=get_marco_color(marco), width=2)
-                    ))
-                
-                fig.update_layout(
-                    title="Evolución Temporal de Marcos Narrativos",
-                    xaxis_title="Tiempo",
-                    yaxis_title="Concentración (%)",
-                    hovermode='x unified',
-                    height=450
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                fig = _build_temporal_fig(periods, marcos_data)
+                st.plotly_chart(fig, use_container_width=True, key="q4_g4_chart")
                 
                 st.markdown("""
                 **📊 Qué estamos viendo:**
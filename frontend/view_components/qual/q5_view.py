@@ -6,11 +6,138 @@ import os
 import plotly.graph_objects as go  # type: ignore
 from view_components.data_loader import load_q5_data as api_load_q5
 from view_components.compat_loader import load_from_api_or_file
+from view_components.ranking import top_k
 
 def load_q5_data():
     """Load Q5 data from API or local file (backward compatibility)."""
     return load_from_api_or_file(api_load_q5, "q5_influenciadores.json", "Q5")
 
+# Bar color per polaridad_dominante (anything that is not a Promotor is drawn red)
+_POLARITY_COLORS = {'Promotor': '#2ecc71', 'Detractor': '#e74c3c'}
+_OTHER_POLARITY_COLOR = '#e74c3c'
+
+def _top_rows(df, col, k=5):
+    """Rows of df with the k largest values of col, largest first (see ranking.top_k)."""
+    return df.iloc[top_k(df[col].to_numpy(dtype=float), k)]
+
+# Fields the rankings and the Gráfico 2 table read; the rest (razon,
+# comentario_evidencia, ...) stay in the raw records for Gráfico 3
+_RANKING_COLUMNS = ['username', 'score_centralidad', 'polaridad_dominante', 'alcance', 'sentimiento']
+
+@st.cache_data(show_spinner=False)
+def _build_influencers_frame(top_influencers):
+    """
+    Influencers DataFrame shared by the three Gráficos (cached across reruns).
+    
+    Returns (df_inf, polarities, user_to_pos, top5_by_polarity):
+    - df_inf: only the _RANKING_COLUMNS, plus a 'color' column with the bar
+      color of each influencer's polarity
+    - polarities: sorted distinct polaridad_dominante values offered by the
+      Gráfico 2 selector
+    - user_to_pos: username -> position in top_influencers, for O(1) lookups
+    - top5_by_polarity: polarity -> (Top 5 rows, rounded detail table), so a
+      Gráfico 2 selection is a dict lookup
+    """
+    df_inf = pd.DataFrame(top_influencers, columns=_RANKING_COLUMNS)
+    df_inf['color'] = df_inf['polaridad_dominante'].map(_POLARITY_COLORS).fillna(_OTHER_POLARITY_COLOR)
+    polarities = sorted(df_inf['polaridad_dominante'].unique())
+    user_to_pos = {}
+    for pos, username in enumerate(df_inf['username'].tolist()):
+        user_to_pos.setdefault(username, pos)  # first match wins, like a boolean-mask .iloc[0]
+    top5_by_polarity = {}
+    for polarity in polarities:
+        df_filtered = _top_rows(df_inf[df_inf['polaridad_dominante'] == polarity], 'score_centralidad')
+        display_df = df_filtered[['username', 'score_centralidad', 'alcance', 'sentimiento']].copy()
+        display_df['score_centralidad'] = display_df['score_centralidad'].round(3)
+        display_df['sentimiento'] = display_df['sentimiento'].round(2)
+        # Missing alcance shows as 0 instead of failing the cast for every Gráfico
+        display_df['alcance'] = display_df['alcance'].fillna(0).astype(int)
+        top5_by_polarity[polarity] = (df_filtered, display_df)
+    return df_inf, polarities, user_to_pos, top5_by_polarity
+
+@st.cache_data(show_spinner=False)
+def _build_top5_fig(usernames, scores, polarities, colors):
+    """Gráfico 1 figure, cached on the plotted users, scores, polarities and colors."""
+    fig = go.Figure([go.Bar(
+        x=usernames,
+        y=scores,
+        marker_color=colors,
+        text=polarities,
+        textposition='outside'
+    )])
+    fig.update_layout(
+        title="Top 5 Influenciadores (Verde=Promotor, Rojo=Detractor)",
+        xaxis_title="Usuario",
+        yaxis_title="Score de Centralidad",
+        showlegend=False,
+        xaxis_tickangle=-45,
+        height=450,
+        uirevision='q5_g1'  # keep zoom/pan state across reruns
+    )
+    return fig
+
+@st.cache_data(show_spinner=False)
+def _build_polarity_fig(selected_polarity, usernames, scores):
+    """Gráfico 2 figure, cached per polarity and plotted values."""
+    polarity_color = _POLARITY_COLORS.get(selected_polarity, _OTHER_POLARITY_COLOR)
+    
+    fig_filter = go.Figure([go.Bar(
+        y=usernames,
+        x=scores,
+        orientation='h',
+        marker_color=polarity_color
+    )])
+    fig_filter.update_layout(
+        title=f"Top 5 {selected_polarity}es (Ordenados por Centralidad)",
+        xaxis_title="Score de Centralidad",
+        yaxis_title="Usuario",
+        showlegend=False,
+        height=400,
+        uirevision=selected_polarity  # reset zoom/pan when the polarity changes
+    )
+    return fig_filter
+
+@st.fragment
+def _g3(df_inf, user_to_pos, top_influencers, selected_polarity):
+    """
+    Gráfico 3: metrics and evidence of the selected influencer (reruns on its own).
+    
+    selected_polarity comes from the Gráfico 2 selector, which stays outside any
+    fragment so a polarity change reruns the page and refreshes the Categoría metric.
+    """
+    selected_influencer = st.selectbox(
+        "Selecciona un influenciador para ver su comentario más influyente:",
+        df_inf['username'].tolist(),
+        key="influencer_selector"
+    )
+    
+    influencer_data = top_influencers[user_to_pos[selected_influencer]]
+    
+    # Display influencer metrics in columns
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Score de Centralidad", f"{influencer_data.get('score_centralidad', 0):.3f}")
+    with col2:
+        polarity_display = influencer_data.get('polaridad_dominante', 'N/A')
+        st.metric("Polaridad", polarity_display)
+    with col3:
+        st.metric("Sentimiento", f"{influencer_data.get('sentimiento', 0):.2f}")
+    
+    # Display comment evidence in expandible
+    st.markdown("**Comentario más influyente:**")
+    with st.expander("💬 Click para ver el comentario completo", expanded=True):
+        comment_text = influencer_data.get('comentario_evidencia', 'No hay comentario disponible')
+        st.markdown(f"> *{comment_text}*")
+    
+    # Additional metrics
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Alcance Estimado", f"{influencer_data.get('alcance', 0):,}")
+    with col2:
+        st.metric("Tipo de Influencia", "Alto" if influencer_data.get('score_centralidad', 0) > 0.7 else "Medio")
+    with col3:
+        st.metric("Categoría", selected_polarity)
+
 def display_q5_influenciadores():
     st.title("🌟 Q5: Análisis de Influenciadores Clave")
     
@@ -41,7 +168,7 @@ def display_q5_influenciadores():
     top_influencers = results.get("top_influenciadores_detallado", [])
     
     if top_influencers:
-        df_inf = pd.DataFrame(top_influencers)
+        df_inf, polarities, user_to_pos, top5_by_polarity = _build_influencers_frame(top_influencers)
         
         # ========================================================================
         # GRÁFICO 1: INFLUENCIA GENERAL (TOP 5 POR CENTRALIDAD COLOREADO)
@@ -61,28 +188,16 @@ def display_q5_influenciadores():
         Los influenciadores en verde son tus embajadores naturales. Los en rojo necesitan atención estratégica.
         """)
         
-        df_top = df_inf.nlargest(5, 'score_centralidad')
-        
-        # Color based on polaridad_dominante
-        colors = ['#2ecc71' if pol == 'Promotor' else '#e74c3c' 
-                 for pol in df_top['polaridad_dominante']]
-        
-        fig = go.Figure([go.Bar(
-            x=df_top['username'],
-            y=df_top['score_centralidad'],
-            marker_color=colors,
-            text=df_top['polaridad_dominante'],
-            textposition='outside'
-        )])
-        fig.update_layout(
-            title="Top 5 Influenciadores (Verde=Promotor, Rojo=Detractor)",
-            xaxis_title="Usuario",
-            yaxis_title="Score de Centralidad",
-            showlegend=False,
-            xaxis_tickangle=-45,
-            height=450
+        df_top = _top_rows(df_inf, 'score_centralidad')
+        
+        fig = _build_top5_fig(
+            df_top['username'].tolist(),
+            df_top['score_centralidad'].tolist(),
+            df_top['polaridad_dominante'].tolist(),
+            df_top['color'].tolist()  # color based on polaridad_dominante
         )
-        st.plotly_chart(fig, use_container_width=True)
+        # Static chart: no mode bar, so no toolbar handlers are set up client-side
+        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False}, key="q5_g1_chart")
         
         # ========================================================================
         # GRÁFICO 2: FILTRO DE ACCIÓN ESTRATÉGICA (SELECTOR PROMOTORES/DETRACTORES)
@@ -104,39 +219,24 @@ def display_q5_influenciadores():
         Verifica el alcance y sentimiento detallado en la tabla abajo para priorizar contactos.
         """)
         
-        polarities = sorted(df_inf['polaridad_dominante'].unique())
         selected_polarity = st.selectbox(
             "Selecciona categoría para ver Top 5:",
             polarities,
             key="polarity_selector"
         )
         
-        df_filtered = df_inf[df_inf['polaridad_dominante'] == selected_polarity].nlargest(5, 'score_centralidad')
+        df_filtered, display_df = top5_by_polarity[selected_polarity]
         
         if len(df_filtered) > 0:
-            polarity_color = '#2ecc71' if selected_polarity == 'Promotor' else '#e74c3c'
-            
-            fig_filter = go.Figure([go.Bar(
-                y=df_filtered['username'],
-                x=df_filtered['score_centralidad'],
-                orientation='h',
-                marker_color=polarity_color
-            )])
-            fig_filter.update_layout(
-                title=f"Top 5 {selected_polarity}es (Ordenados por Centralidad)",
-                xaxis_title="Score de Centralidad",
-                yaxis_title="Usuario",
-                showlegend=False,
-                height=400
+            fig_filter = _build_polarity_fig(
+                selected_polarity,
+                df_filtered['username'].tolist(),
+                df_filtered['score_centralidad'].tolist()
             )
-            st.plotly_chart(fig_filter, use_container_width=True)
+            st.plotly_chart(fig_filter, use_container_width=True, key="q5_g2_chart")
             
             # Show table
             st.markdown("**Detalle de influenciadores:**")
-            display_df = df_filtered[['username', 'score_centralidad', 'alcance', 'sentimiento']].copy()
-            display_df['score_centralidad'] = display_df['score_centralidad'].round(3)
-            display_df['sentimiento'] = display_df['sentimiento'].round(2)
-            display_df['alcance'] = display_df['alcance'].astype(int)
             st.dataframe(display_df, use_container_width=True)
         else:
             st.info(f"No {selected_polarity}es found")
@@ -159,37 +259,6 @@ def display_q5_influenciadores():
         Lee los comentarios para entender motivaciones. Busca patrones: ¿qué aspectos destacan promotores vs detractores?
         """)
         
-        selected_influencer = st.selectbox(
-            "Selecciona un influenciador para ver su comentario más influyente:",
-            df_inf['username'].tolist(),
-            key="influencer_selector"
-        )
-        
-        influencer_data = df_inf[df_inf['username'] == selected_influencer].iloc[0]
-        
-        # Display influencer metrics in columns
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Score de Centralidad", f"{influencer_data.get('score_centralidad', 0):.3f}")
-        with col2:
-            polarity_display = influencer_data.get('polaridad_dominante', 'N/A')
-            st.metric("Polaridad", polarity_display)
-        with col3:
-            st.metric("Sentimiento", f"{influencer_data.get('sentimiento', 0):.2f}")
-        
-        # Display comment evidence in expandible
-        st.markdown("**Comentario más influyente:**")
-        with st.expander("💬 Click para ver el comentario completo", expanded=True):
-            comment_text = influencer_data.get('comentario_evidencia', 'No hay comentario disponible')
-            st.markdown(f"> *{comment_text}*")
-        
-        # Additional metrics
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Alcance Estimado", f"{influencer_data.get('alcance', 0):,}")
-        with col2:
-            st.metric("Tipo de Influencia", "Alto" if influencer_data.get('score_centralidad', 0) > 0.7 else "Medio")
-        with col3:
-            st.metric("Categoría", selected_polarity)
+        _g3(df_inf, user_to_pos, top_influencers, selected_polarity)
     else:
         st.info("No influencers data available")
@@ -0,0 +1,35 @@
+"""
+Ranking helpers shared by the view components.
+"""
+
+import numpy as np
+
+
+def top_k(values, k: int = 5) -> np.ndarray:
+    """
+    Positions of the k largest values, largest first.
+
+    Matches pandas.Series.nlargest(k): ties keep their original order (LLM
+    scores often tie) and NaN values rank after every number. np.partition
+    finds the k-th largest value in O(n); only the values at least that large
+    (k plus any ties) are then stable-sorted.
+
+    Args:
+        values: 1-D array-like of scores
+        k: Number of positions to return (fewer if there are fewer values)
+
+    Returns:
+        Integer array of positions into values
+    """
+    # Negated so that "largest first" is ascending order; NaN stays last
+    neg = -np.asarray(values, dtype=float)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= neg.size:
+        return np.argsort(neg, kind="stable")
+    kth = np.partition(neg, k - 1)[k - 1]
+    if kth != kth:
+        # Fewer than k numbers: the tail is NaN, so every position is a candidate
+        return np.argsort(neg, kind="stable")[:k]
+    candidates = np.flatnonzero(neg <= kth)  # ascending positions, so ties keep their order
+    return candidates[np.argsort(neg[candidates], kind="stable")[:k]]
@@ -0,0 +1,43 @@
+"""
+Pixely Partners - Docs Runner Tests
+
+Discovery parses `docs/` sources for display functions without importing them.
+"""
+
+import pytest
+import sys
+import os
+
+# Add project root and frontend to path
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "frontend"))
+
+from frontend.docs_runner import _find_display_functions
+
+
+class TestFindDisplayFunctions:
+    """_find_display_functions reads names from the AST only."""
+
+    @pytest.mark.parametrize("source, expected", [
+        ("def display_a():\n    pass\n\ndef helper():\n    pass\n", ["display_a"]),
+        ("async def display_b():\n    pass\n", ["display_b"]),
+        ("__all__ = ['display_c', 'other']\n\ndef display_d():\n    pass\n", ["display_c"]),
+        ("class View:\n    def display_e(self):\n        pass\n", []),
+        ("import missing_heavy_dependency\n\ndef display_f():\n    pass\n", ["display_f"]),
+    ])
+    def test_find_display_functions(self, tmp_path, source, expected):
+        path = tmp_path / "mod.py"
+        path.write_text(source, encoding="utf-8")
+        assert _find_display_functions(str(path)) == expected
+
+    def test_syntax_error_raises(self, tmp_path):
+        """Parse errors propagate so discovery can warn and skip the module."""
+        path = tmp_path / "broken.py"
+        path.write_text("def display_(:\n", encoding="utf-8")
+        with pytest.raises(SyntaxError):
+            _find_display_functions(str(path))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,69 @@
+"""
+Pixely Partners - Q3 View Helper Tests
+
+Checks for the pure data helpers behind the Q3 topic charts.
+"""
+
+import pytest
+import sys
+import os
+
+import numpy as np
+
+# Add project root and frontend to path (views import `view_components.*`)
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "frontend"))
+
+from frontend.view_components.qual.q3_view import _to_float, _build_posts_frame
+
+
+class TestToFloat:
+    """Scalar coercion used for the global topic metrics."""
+
+    @pytest.mark.parametrize("value, expected", [
+        (None, 0.0),
+        ("x", 0.0),
+        (float("nan"), 0.0),
+        ("1.5", 1.5),
+        (2, 2.0),
+        (-0.25, -0.25),
+    ])
+    def test_to_float(self, value, expected):
+        assert _to_float(value) == expected
+
+
+class TestBuildPostsFrame:
+    """Per-post frame and float32 topic matrix."""
+
+    def test_topic_matrix(self):
+        """Topics are unioned and missing/None concentrations are 0."""
+        per_post = [
+            {"link": "https://a", "topicos": {"Precio": 0.5, "Envío": None}},
+            {"link": "https://b", "topicos": {"Calidad": 0.75}},
+            {"link": "https://a", "topicos": "n/a"},
+        ]
+        df_posts, available, topics_mat, topic_cols, url_to_pos = _build_posts_frame(per_post)
+
+        assert available == ["Calidad", "Envío", "Precio"]
+        assert topics_mat.shape == (3, 3)
+        assert topics_mat.dtype == np.float32
+        assert topics_mat[0, topic_cols["Precio"]] == 0.5
+        assert topics_mat[0, topic_cols["Envío"]] == 0.0
+        assert topics_mat[0, topic_cols["Calidad"]] == 0.0
+        assert topics_mat[1, topic_cols["Calidad"]] == 0.75
+        assert not topics_mat[2].any()
+        # First occurrence of a duplicated link wins
+        assert url_to_pos == {"https://a": 0, "https://b": 1}
+        assert df_posts["link_short60"].tolist()[1] == "https://b..."
+
+    def test_posts_without_links(self):
+        """Posts without a link get positional labels."""
+        df_posts, _, topics_mat, _, url_to_pos = _build_posts_frame([{"topicos": {}}, {"topicos": {}}])
+        assert df_posts["link"].tolist() == ["Post 0", "Post 1"]
+        assert topics_mat.shape == (2, 0)
+        assert url_to_pos == {"Post 0": 0, "Post 1": 1}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
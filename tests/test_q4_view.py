@@ -0,0 +1,51 @@
+"""
+Pixely Partners - Q4 View Helper Tests
+
+Checks for the pure data helpers behind the Q4 narrative-frame charts.
+"""
+
+import pytest
+import sys
+import os
+
+# Add project root and frontend to path (views import `view_components.*`)
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "frontend"))
+
+from frontend.view_components.qual.q4_view import _build_temporal_data
+
+
+class TestBuildTemporalData:
+    """Period labels are coalesced per row; marcos become one list per period."""
+
+    @pytest.mark.parametrize("temporal_data, expected_periods, expected_marcos", [
+        ([], [], {}),
+        (
+            [
+                {"semana": 1, "marcos_distribucion": {"A": 1}},
+                {"periodo": "S2", "marcos_distribucion": {"A": 2, "B": 3}},
+                {"semana": 3},
+            ],
+            ["Semana 1", "S2", "Semana 3"],
+            {"A": [1.0, 2.0, None], "B": [None, 3.0, None]},
+        ),
+        (
+            [{"fecha": "2025-01-06", "marcos_distribucion": {"A": 0.5}}, "ruido"],
+            ["2025-01-06"],
+            {"A": [0.5]},
+        ),
+    ])
+    def test_build_temporal_data(self, temporal_data, expected_periods, expected_marcos):
+        periods, marcos_data = _build_temporal_data(temporal_data)
+        assert periods == expected_periods
+        # NaN marks a period without that marco
+        normalized = {
+            marco: [None if v != v else v for v in values]
+            for marco, values in marcos_data.items()
+        }
+        assert normalized == expected_marcos
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,49 @@
+"""
+Pixely Partners - Ranking Helper Tests
+
+top_k should rank like pandas.Series.nlargest while selecting in O(n).
+"""
+
+import pytest
+import sys
+import os
+
+import pandas as pd
+
+# Add project root and frontend to path
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "frontend"))
+
+from frontend.view_components.ranking import top_k
+
+NAN = float("nan")
+
+
+class TestTopK:
+    """Positions of the k largest values."""
+
+    @pytest.mark.parametrize("values, k, expected", [
+        ([3, 1, 2], 5, [0, 2, 1]),                         # k larger than the input
+        ([0.2] * 6 + [0.5], 5, [6, 0, 1, 2, 3]),           # ties keep their original order
+        ([0.2] * 50 + [0.5] + [0.2] * 50, 5, [50, 0, 1, 2, 3]),
+        ([3, 1, 3, NAN, 0, 3, 5], 5, [6, 0, 2, 5, 1]),
+        ([NAN, 1, NAN, 2], 4, [3, 1, 0, 2]),               # NaN ranks last
+        ([NAN, 1, NAN, 2], 3, [3, 1, 0]),                  # fewer than k numbers
+        ([], 5, []),
+        ([1, 2, 3], 0, []),
+    ])
+    def test_top_k(self, values, k, expected):
+        assert top_k(values, k).tolist() == expected
+
+    @pytest.mark.parametrize("values", [
+        [0.1, 0.9, 0.5, 0.9, 0.3, 0.5, 0.5, 0.0],
+        [1, 1, 1, 1, 1, 1, 1],
+        [0.4, NAN, 0.4, 0.7, NAN, 0.1, 0.4],
+    ])
+    def test_matches_nlargest(self, values):
+        assert top_k(values, 5).tolist() == pd.Series(values).nlargest(5).index.tolist()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])